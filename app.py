@@ -1,15 +1,26 @@
+import click
 from datetime import datetime
-from flask import Flask, render_template, session
+from flask import Flask, render_template, session, request
 from flask_mail import Mail
-from config import SECRET_KEY
-from sqlalchemy import create_engine, MetaData
-from database import Base, get_db
+from config import SECRET_KEY, SCHEDULER_ENABLED
+from sqlalchemy import MetaData, text
+from database import SessionLocal, engine, init_app as init_database
 from models import init_db
+from models.counters import repair_project_counters
+from models.project import Project
+from models.user import User
+from models.migrate import ensure_indexes
+from services.search import ensure_search_index
+from services.importer import import_tasks
+from services.scheduler import start_scheduler
+from services.http_cache import project_card
 from controllers.auth_controller import auth_bp
 from controllers.project_controller import project_bp
 from controllers.task_controller import task_bp
 from controllers.profile_controller import profile_bp
 from controllers.admin_controller import admin_bp
+from controllers.search_controller import search_bp
+from controllers.api_controller import api_bp
 
 app = Flask(__name__)
 app.secret_key = SECRET_KEY
@@ -27,9 +38,6 @@ app.config['MAIL_DEFAULT_SENDER'] = 'your-email@gmail.com'
 
 mail = Mail(app)
 
-DATABASE_URL = "sqlite:///todo.db"  
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-
 def migrate_database():
     try:
         metadata = MetaData()
@@ -41,15 +49,28 @@ def migrate_database():
         if "updated_at" not in projects.c:
             print("Adding updated_at column to projects table...")
             with engine.connect() as connection:
-                connection.execute("ALTER TABLE projects ADD COLUMN updated_at DATETIME")
+                connection.execute(text("ALTER TABLE projects ADD COLUMN updated_at DATETIME"))
                 connection.execute(
-                    "UPDATE projects SET updated_at = ? WHERE updated_at IS NULL",
-                    (datetime.utcnow(),)
+                    text("UPDATE projects SET updated_at = :now WHERE updated_at IS NULL"),
+                    {"now": datetime.utcnow()}
                 )
                 connection.commit()
             print("Migration completed successfully.")
         else:
             print("updated_at column already exists.")
+        if "task_count" not in projects.c or "completed_count" not in projects.c:
+            print("Adding task counter columns to projects table...")
+            with engine.connect() as connection:
+                if "task_count" not in projects.c:
+                    connection.execute(text("ALTER TABLE projects ADD COLUMN task_count INTEGER NOT NULL DEFAULT 0"))
+                if "completed_count" not in projects.c:
+                    connection.execute(text("ALTER TABLE projects ADD COLUMN completed_count INTEGER NOT NULL DEFAULT 0"))
+                connection.commit()
+            db = SessionLocal()
+            try:
+                repair_project_counters(db)
+            finally:
+                db.close()
         users = metadata.tables.get("users")
         if users is None:
             print("Error: 'users' table does not exist.")
@@ -57,12 +78,12 @@ def migrate_database():
         if "avatar_url" not in users.c:
             print("Adding avatar_url column to users table...")
             with engine.connect() as connection:
-                connection.execute("ALTER TABLE users ADD COLUMN avatar_url VARCHAR(200)")
+                connection.execute(text("ALTER TABLE users ADD COLUMN avatar_url VARCHAR(200)"))
                 connection.commit()
         if "theme" not in users.c:
             print("Adding theme column to users table...")
             with engine.connect() as connection:
-                connection.execute("ALTER TABLE users ADD COLUMN theme VARCHAR(20) DEFAULT 'light'")
+                connection.execute(text("ALTER TABLE users ADD COLUMN theme VARCHAR(20) DEFAULT 'light'"))
                 connection.commit()
         tasks = metadata.tables.get("tasks")
         if tasks is None:
@@ -71,18 +92,26 @@ def migrate_database():
         if "owner_id" not in tasks.c:
             print("Adding owner_id column to tasks table...")
             with engine.connect() as connection:
-                connection.execute("ALTER TABLE tasks ADD COLUMN owner_id INTEGER")
+                connection.execute(text("ALTER TABLE tasks ADD COLUMN owner_id INTEGER"))
                 connection.commit()
+        ensure_indexes()
+        ensure_search_index(engine)
     except Exception as e:
         print(f"Error during migration: {e}")
 
 init_db()
 migrate_database()
+init_database(app)
 app.register_blueprint(auth_bp)
 app.register_blueprint(project_bp)
 app.register_blueprint(task_bp)
 app.register_blueprint(profile_bp)
 app.register_blueprint(admin_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(api_bp)
+
+if SCHEDULER_ENABLED:
+    start_scheduler(app)
 
 @app.route('/')
 def index():
@@ -92,26 +121,69 @@ def index():
 def debug_session():
     return str(dict(session))
 
+@app.cli.command("repair-counters")
+def repair_counters_command():
+    """Tính lại task_count / completed_count cho mọi project."""
+    db = SessionLocal()
+    try:
+        updated = repair_project_counters(db)
+    finally:
+        db.close()
+    print(f"Repaired task counters for {updated} projects.")
+
+@app.cli.command("import-tasks")
+@click.argument("project_id", type=int)
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--owner", "owner_id", type=int, required=True, help="User id that will own the imported tasks.")
+def import_tasks_command(project_id, path, owner_id):
+    """Nhập task từ file CSV/JSONL (cùng schema với export) vào một project."""
+    file_format = "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    db = SessionLocal()
+    try:
+        if db.get(Project, project_id) is None:
+            raise click.ClickException(f"Project {project_id} does not exist.")
+        if db.get(User, owner_id) is None:
+            raise click.ClickException(f"User {owner_id} does not exist.")
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            report = import_tasks(db, project_id, owner_id, stream, file_format)
+    finally:
+        db.close()
+    print(f"Imported {report.imported} tasks, {report.error_count} errors.")
+    for line, message in report.errors:
+        print(f"  line {line}: {message}")
+
 @app.context_processor
 def inject_now():
     return {'now': datetime.now()}
 
+app.add_template_global(project_card)
+
 from flask import send_from_directory
-from models.user import User
+from services.theme import get_user_theme
 from utils import allowed_file, UPLOAD_FOLDER
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Tên file avatar chứa hash nội dung, không bao giờ bị ghi đè nên được cache vĩnh viễn
+AVATAR_MAX_AGE = 365 * 24 * 3600
+
 @app.route('/uploads/avatars/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    response = send_from_directory(app.config['UPLOAD_FOLDER'], filename, max_age=AVATAR_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# Các endpoint phục vụ file tĩnh không cần theme
+THEMELESS_ENDPOINTS = {"static", "uploaded_file"}
 
 @app.before_request
 def apply_user_theme():
-    if 'user_id' in session:
-        db = next(get_db())
-        user = db.query(User).get(session['user_id'])
-        session['theme'] = user.theme if user else 'light'
+    if request.endpoint in THEMELESS_ENDPOINTS or 'user_id' not in session:
+        return
+    theme = get_user_theme(session['user_id'])
+    if session.get('theme') != theme:
+        session['theme'] = theme
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
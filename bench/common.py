@@ -0,0 +1,118 @@
+"""Tiện ích chung cho các script benchmark trong bench/.
+
+Mỗi script chạy trên một DB SQLite tạm (hoặc BENCH_DATABASE_URL nếu đặt),
+không bao giờ đụng tới todo.db. Ví dụ: python bench/dashboard.py --projects 200
+"""
+import atexit
+import itertools
+import os
+import shutil
+import sys
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Phải đặt trước khi import config/database
+WORKDIR = tempfile.mkdtemp(prefix="todo-bench-")
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{WORKDIR}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+SEED_BATCH_SIZE = 5000
+
+WORDS = (
+    "design review deploy invoice budget meeting report client server backup release "
+    "onboarding roadmap migration security audit newsletter hiring database dashboard"
+).split()
+# Thêm vài nghìn từ giả để mỗi từ thật chỉ khớp một phần nhỏ dữ liệu
+_syllables = random.Random(0)
+VOCABULARY = WORDS + [
+    "".join(_syllables.choice(("ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "su")) for _ in range(4))
+    for _ in range(3000)
+]
+
+def load_app():
+    """Import app (tạo schema, index, FTS) và trả về Flask app."""
+    import app as app_module
+    app_module.app.config["TESTING"] = True
+    return app_module.app
+
+def sentence(rng, words=6):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+def seed(owner_count=1, projects_per_owner=20, tasks_per_project=50, seed_value=1):
+    """Chèn dữ liệu giả bằng INSERT hàng loạt; trả về danh sách id của user.
+
+    Đi vòng ORM cho nhanh nên bộ đếm của project được tính lại ở cuối.
+    """
+    from sqlalchemy import insert, select
+    from werkzeug.security import generate_password_hash
+    from database import SessionLocal
+    from models.counters import repair_project_counters
+    from models.project import Project
+    from models.task import Task
+    from models.user import User
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        start = db.scalar(select(User.id).order_by(User.id.desc()).limit(1)) or 0
+        password_hash = generate_password_hash("secret")
+        db.execute(insert(User), [
+            {"username": f"bench{start + i}", "password_hash": password_hash}
+            for i in range(1, owner_count + 1)
+        ])
+        user_ids = db.scalars(select(User.id).where(User.id > start).order_by(User.id)).all()
+        db.execute(insert(Project), [
+            {"title": f"Project {n} {sentence(rng, 2)}", "description": sentence(rng, 12),
+             "owner_id": user_id, "created_at": now, "updated_at": now}
+            for user_id in user_ids for n in range(projects_per_owner)
+        ])
+        projects = db.execute(
+            select(Project.id, Project.owner_id).where(Project.owner_id.in_(user_ids))
+        ).all()
+        # Sinh và chèn theo lô để dữ liệu cỡ hàng triệu dòng không phải nằm hết trong bộ nhớ
+        rows = (
+            {"title": f"Task {n} {sentence(rng, 3)}", "description": sentence(rng, 20),
+             "project_id": project.id, "owner_id": project.owner_id,
+             "completed": rng.random() < 0.4, "priority": rng.choice(("low", "medium", "high")),
+             "due_date": now + timedelta(days=rng.randint(-30, 60)),
+             "created_at": now, "updated_at": now, "reminder_sent": False}
+            for project in projects for n in range(tasks_per_project)
+        )
+        while batch := list(itertools.islice(rows, SEED_BATCH_SIZE)):
+            db.execute(insert(Task), batch)
+            db.commit()
+        repair_project_counters(db)
+        return list(user_ids)
+    finally:
+        db.close()
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+        session["username"] = f"bench{user_id}"
+        session["is_admin"] = False
+
+def measure(fn, repeat=50, warmup=3):
+    """Chạy fn() nhiều lần, trả về thời gian từng lần (ms)."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<45} median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms   n={len(timings)}")
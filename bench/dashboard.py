@@ -0,0 +1,49 @@
+"""Đo độ trễ trang dashboard (/project/) theo số project của user.
+
+Ba trường hợp: render đầy đủ khi cache fragment rỗng, render đầy đủ khi
+cache fragment đã nóng, và GET có điều kiện trả 304.
+
+    python bench/dashboard.py --projects 50 200 --tasks 20 --repeat 50
+"""
+import argparse
+from common import load_app, seed, login, measure, report
+
+def run(app, project_count, task_count, repeat):
+    from services.http_cache import fragment_cache
+    user_id = seed(projects_per_owner=project_count, tasks_per_project=task_count)[0]
+    client = app.test_client()
+    login(client, user_id)
+
+    def cold():
+        fragment_cache.clear()
+        response = client.get("/project/")
+        assert response.status_code == 200
+
+    def warm():
+        response = client.get("/project/")
+        assert response.status_code == 200
+
+    etag = client.get("/project/").headers["ETag"]
+
+    def revalidate():
+        response = client.get("/project/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    label = f"{project_count} projects x {task_count} tasks"
+    report(f"{label}: full render, cold", measure(cold, repeat))
+    report(f"{label}: full render, warm", measure(warm, repeat))
+    report(f"{label}: 304 revalidation", measure(revalidate, repeat))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--tasks", type=int, default=20, help="Tasks per project")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    app = load_app()
+    for project_count in args.projects:
+        run(app, project_count, args.tasks, args.repeat)
+
+if __name__ == "__main__":
+    main()
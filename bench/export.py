@@ -0,0 +1,52 @@
+"""Đo thông lượng export theo từng định dạng (CSV, JSONL, Parquet nếu có pyarrow).
+
+Chạy trọn generator stream_tasks như route export, đếm số byte sinh ra.
+
+    python bench/export.py --projects 20 --tasks 2500 --repeat 5
+"""
+import argparse
+import statistics
+from common import load_app, seed, measure
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=2500, help="Tasks per project")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    load_app()
+    from sqlalchemy import select
+    from database import SessionLocal
+    from models.task import Task
+    from services.export import EXPORT_FORMATS, stream_tasks
+    from services.permissions import accessible_project_ids
+    from services.tag_service import set_tags_for_tasks
+
+    user_id = seed(projects_per_owner=args.projects, tasks_per_project=args.tasks)[0]
+    db = SessionLocal()
+    try:
+        # Khoảng một nửa số task có tag, để cột tags gộp trong SQL cũng được đo
+        task_ids = db.scalars(select(Task.id).where(Task.owner_id == user_id)).all()
+        set_tags_for_tasks(db, {task_id: ["bench", f"tag{task_id % 10}"] for task_id in task_ids[::2]})
+        db.commit()
+    finally:
+        db.close()
+    rows = args.projects * args.tasks
+    print(f"{rows} tasks in {args.projects} projects")
+
+    for name, export_format in EXPORT_FORMATS.items():
+        size = 0
+
+        def run():
+            nonlocal size
+            size = 0
+            for part in stream_tasks(export_format, accessible_project_ids(user_id), include_project=True):
+                size += len(part.encode() if isinstance(part, str) else part)
+
+        median = statistics.median(measure(run, args.repeat, warmup=1)) / 1000
+        print(f"{name:<8} {median * 1000:9.1f} ms   {rows / median:11,.0f} rows/s   "
+              f"{size / median / 1e6:7.1f} MB/s   {size / 1e6:7.2f} MB")
+
+if __name__ == "__main__":
+    main()
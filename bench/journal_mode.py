@@ -0,0 +1,87 @@
+"""So sánh thông lượng đọc/ghi đồng thời giữa WAL và rollback journal (DELETE).
+
+Mỗi chế độ chạy trên một file DB mới: vài thread ghi (mỗi lần ghi một commit)
+và vài thread đọc chạy song song trong cùng khoảng thời gian. Lỗi
+"database is locked" được đếm thay vì làm dừng benchmark.
+
+    python bench/journal_mode.py --writers 4 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import threading
+import time
+from common import load_app, WORKDIR
+
+def run(mode, writers, readers, seconds):
+    import database
+    from sqlalchemy import func, text
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+    from models.user import User
+
+    # _apply_sqlite_pragmas đọc giá trị này mỗi khi mở kết nối
+    database.SQLITE_JOURNAL_MODE = mode
+    path = os.path.join(WORKDIR, f"journal-{mode.lower()}.db")
+    engine = database.create_db_engine(f"sqlite:///{path}")
+    try:
+        database.Base.metadata.create_all(engine)
+        with engine.connect() as connection:
+            actual = connection.execute(text("PRAGMA journal_mode")).scalar()
+        Session = sessionmaker(bind=engine, autoflush=False)
+        counts = {"writes": 0, "reads": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+
+        def bump(key):
+            with lock:
+                counts[key] += 1
+
+        def write(worker):
+            n = 0
+            while time.monotonic() < deadline:
+                n += 1
+                try:
+                    with Session() as db:
+                        db.add(User(username=f"{worker}-{n}", password_hash="x"))
+                        db.commit()
+                    bump("writes")
+                except OperationalError:
+                    bump("locked")
+
+        def read():
+            while time.monotonic() < deadline:
+                try:
+                    with Session() as db:
+                        db.query(func.count(User.id)).scalar()
+                        db.query(User).order_by(User.id.desc()).limit(10).all()
+                    bump("reads")
+                except OperationalError:
+                    bump("locked")
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+        threads += [threading.Thread(target=read) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        engine.dispose()
+
+    print(f"{actual:<8} {counts['writes'] / seconds:10,.0f} writes/s {counts['reads'] / seconds:10,.0f} reads/s "
+          f"{counts['locked']:8} locked errors")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--modes", nargs="+", default=["WAL", "DELETE"])
+    args = parser.parse_args()
+
+    load_app()
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g} s per mode")
+    for mode in args.modes:
+        run(mode, args.writers, args.readers, args.seconds)
+
+if __name__ == "__main__":
+    main()
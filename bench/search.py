@@ -0,0 +1,50 @@
+"""So sánh tìm kiếm FTS5 với LIKE '%...%' trên cùng một bộ dữ liệu.
+
+Đo search_accessible (trang tìm kiếm toàn cục) cho một user và số task khớp
+trên toàn bảng, lần lượt với FTS bật và tắt.
+
+Mặc định khoảng 1 triệu task: ở vài chục nghìn dòng, quét LIKE còn quá rẻ để
+so sánh có ý nghĩa. Tạo dữ liệu mất vài phút; dùng --owners nhỏ hơn để chạy nhanh.
+
+    python bench/search.py --owners 100 --projects 10 --tasks 1000 --repeat 10
+"""
+import argparse
+from common import load_app, seed, measure, report
+
+# Một từ, hai từ (FTS: mọi từ, LIKE: đúng cụm), tiền tố, và không khớp gì
+QUERIES = ("budget", "security audit", "migr", "xyzzy")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=10, help="Projects per owner")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks per project")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    load_app()
+    from sqlalchemy import select, func
+    from database import SessionLocal
+    from services import search
+
+    if not search._fts_enabled:
+        print("FTS5 is not available in this SQLite build; nothing to compare.")
+        return
+    user_id = seed(args.owners, args.projects, args.tasks)[0]
+    print(f"{args.owners * args.projects * args.tasks:,} tasks, searching as one of {args.owners} owners")
+
+    db = SessionLocal()
+    try:
+        for query in QUERIES:
+            for mode, enabled in (("fts", True), ("like", False)):
+                search._fts_enabled = enabled
+                count = lambda: db.scalar(select(func.count()).select_from(search.match_tasks(query)))
+                print(f"{mode} {query!r}: {count()} matching tasks")
+                report("  search page", measure(lambda: search.search_accessible(db, user_id, query), args.repeat))
+                report("  count all matches", measure(count, args.repeat))
+            search._fts_enabled = True
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
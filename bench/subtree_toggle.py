@@ -0,0 +1,83 @@
+"""So sánh toggle hoàn thành cả cây sub-task: CTE + một câu UPDATE với cách duyệt ORM cũ.
+
+Cách cũ nạp task.subtasks từng cấp (lazy load) rồi đặt completed cho từng đối
+tượng; mỗi lần đo mở session mới nên không có sẵn gì trong identity map.
+
+    python bench/subtree_toggle.py --width 200 --fanout 5 --depth 200 --repeat 10
+"""
+import argparse
+from common import load_app, seed, measure, report
+
+def update_subtasks_status(task, status):
+    """Bản sao của hàm đệ quy trong task_controller trước khi chuyển sang CTE."""
+    for subtask in task.subtasks:
+        subtask.completed = status
+        update_subtasks_status(subtask, status)
+
+def build_trees(db, project_id, owner_id, width, fanout, depth):
+    from models.task import Task
+
+    def add(title, parent=None):
+        task = Task(title=title, project_id=project_id, owner_id=owner_id, parent_id=parent.id if parent else None)
+        db.add(task)
+        db.flush()
+        return task
+
+    wide = add("wide")
+    for i in range(width):
+        child = add(f"wide {i}", wide)
+        for j in range(fanout):
+            add(f"wide {i}.{j}", child)
+    deep = node = add("deep 0")
+    for level in range(1, depth):
+        node = add(f"deep {level}", node)
+    db.commit()
+    return {"wide": (wide.id, 1 + width + width * fanout), "deep": (deep.id, depth)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=200, help="Children of the wide root")
+    parser.add_argument("--fanout", type=int, default=5, help="Grandchildren per child")
+    parser.add_argument("--depth", type=int, default=200, help="Levels of the deep chain")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    load_app()
+    from database import SessionLocal
+    from models.project import Project
+    from models.task import Task
+    from services.task_ops import set_subtree_completed
+
+    user_id = seed(projects_per_owner=1, tasks_per_project=0)[0]
+    db = SessionLocal()
+    try:
+        project_id = db.query(Project.id).filter_by(owner_id=user_id).scalar()
+        trees = build_trees(db, project_id, user_id, args.width, args.fanout, args.depth)
+    finally:
+        db.close()
+
+    def orm_walk(root_id):
+        db = SessionLocal()
+        try:
+            task = db.get(Task, root_id)
+            task.completed = not task.completed
+            update_subtasks_status(task, task.completed)
+            db.commit()
+        finally:
+            db.close()
+
+    def cte_update(root_id):
+        db = SessionLocal()
+        try:
+            task = db.get(Task, root_id)
+            set_subtree_completed(db, task, not task.completed)
+            db.commit()
+        finally:
+            db.close()
+
+    for name, (root_id, size) in trees.items():
+        for label, toggle in (("orm walk", orm_walk), ("cte update", cte_update)):
+            report(f"{name} tree ({size} tasks): {label}", measure(lambda: toggle(root_id), args.repeat, warmup=1))
+
+if __name__ == "__main__":
+    main()
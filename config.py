@@ -5,4 +5,30 @@ load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 
-print("SK: ", SECRET_KEY)
\ No newline at end of file
+print("SK: ", SECRET_KEY)
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./todo.db")
+
+# PRAGMA áp dụng cho mỗi kết nối SQLite mới
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # số âm = KiB
+
+# Pool kết nối (bỏ qua với SQLite in-memory)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # giây
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Nhắc nhở hạn chót chạy nền
+REMINDER_INTERVAL = int(os.getenv("REMINDER_INTERVAL", "900"))  # giây
+REMINDER_SMTP_CONCURRENCY = int(os.getenv("REMINDER_SMTP_CONCURRENCY", "2"))
+
+# Bộ lập lịch job bảo trì; tắt trên web worker nếu chạy riêng `python -m services.scheduler`
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCHEDULER_TICK = int(os.getenv("SCHEDULER_TICK", "30"))  # giây
+
+# Cache HTML đã render của thẻ project trên dashboard
+FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
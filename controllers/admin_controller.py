@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, session, redirect, url_for, request, flash
+from flask import Blueprint, render_template, session, redirect, url_for, request, flash, Response, stream_with_context
 from database import get_db
 from models.user import User
+from services.theme import invalidate_user_theme
+from services.user_directory import list_users, stream_users_csv
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -9,16 +11,33 @@ def admin_dashboard():
     if not session.get("is_admin"):
         return redirect(url_for("index"))
 
-    db = next(get_db())
-    users = db.query(User).all()
-    return render_template("admin/admin_dashboard.html", users=users)
+    search_query = request.args.get("q", "").strip()
+    try:
+        after = int(request.args["after"]) if request.args.get("after") else None
+    except ValueError:
+        after = None
+
+    db = get_db()
+    page = list_users(db, search_query=search_query, after=after)
+    return render_template("admin/admin_dashboard.html", page=page, search_query=search_query, after=after)
+
+@admin_bp.route("/users.csv")
+def export_users():
+    if not session.get("is_admin"):
+        return redirect(url_for("index"))
+
+    return Response(
+        stream_with_context(stream_users_csv(request.args.get("q", "").strip())),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment;filename=users.csv"}
+    )
 
 @admin_bp.route("/edit/<int:user_id>", methods=["GET", "POST"])
 def edit_user(user_id):
     if not session.get("is_admin"):
         return redirect(url_for("index"))
 
-    db = next(get_db())
+    db = get_db()
     user = db.query(User).filter_by(id=user_id).first()
 
     if not user:
@@ -29,6 +48,7 @@ def edit_user(user_id):
         user.username = request.form.get("username")
         user.is_admin = True if request.form.get("is_admin") == "1" else False
         db.commit()
+        invalidate_user_theme(user.id)
         flash("User updated successfully!", "success")
         return redirect(url_for("admin.admin_dashboard"))
 
@@ -39,11 +59,12 @@ def delete_user(user_id):
     if not session.get("is_admin"):
         return redirect(url_for("index"))
 
-    db = next(get_db())
+    db = get_db()
     user = db.query(User).filter_by(id=user_id).first()
     if user:
         db.delete(user)
         db.commit()
+        invalidate_user_theme(user_id)
         flash("User deleted successfully!", "success")
 
     return redirect(url_for("admin.admin_dashboard"))
@@ -53,7 +74,7 @@ def create_user():
     if not session.get("is_admin"):
         return redirect(url_for("index"))
 
-    db = next(get_db())
+    db = get_db()
 
     if request.method == "POST":
         username = request.form.get("username")
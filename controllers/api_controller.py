@@ -0,0 +1,133 @@
+from flask import Blueprint, request, session, jsonify
+from sqlalchemy.orm import selectinload
+from database import get_db
+from models.project import Project
+from models.task import Task
+from models.project_share import ProjectShare
+from services.api import (
+    ApiError, TASK_FIELDS, PROJECT_FIELDS, SHARE_FIELDS,
+    parse_fields, parse_limit, parse_cursor, page_of, serialize_task, serialize_project,
+    require_role, accessible_projects_query, get_task,
+    create_task, update_task, toggle_task, delete_task, run_batch,
+)
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+@api_bp.errorhandler(ApiError)
+def handle_api_error(error):
+    get_db().rollback()
+    return jsonify({"error": error.message}), error.status
+
+@api_bp.before_request
+def require_login():
+    # API dùng chung cookie session với giao diện web
+    if "user_id" not in session:
+        return jsonify({"error": "Authentication required."}), 401
+
+def json_body():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ApiError("Request body must be a JSON object")
+    return data
+
+def task_fields():
+    return parse_fields(request.args.get("fields"), TASK_FIELDS)
+
+@api_bp.route("/projects")
+def list_projects():
+    user_id = session["user_id"]
+    fields = parse_fields(request.args.get("fields"), PROJECT_FIELDS)
+    limit = parse_limit(request.args.get("limit"))
+    after = parse_cursor(request.args.get("after"))
+
+    query = accessible_projects_query(get_db(), user_id)
+    if after is not None:
+        query = query.filter(Project.id > after)
+    rows, next_cursor = page_of(query.limit(limit + 1).all(), limit)
+    data = [
+        serialize_project(project, "owner" if project.owner_id == user_id else role, fields)
+        for project, role in rows
+    ]
+    return jsonify({"data": data, "next_cursor": next_cursor})
+
+@api_bp.route("/projects/<int:project_id>")
+def get_project(project_id):
+    db = get_db()
+    role = require_role(db, project_id, session["user_id"], "viewer")
+    fields = parse_fields(request.args.get("fields"), PROJECT_FIELDS)
+    project = db.get(Project, project_id)
+    return jsonify({"data": serialize_project(project, role, fields)})
+
+@api_bp.route("/projects/<int:project_id>/tasks")
+def list_tasks(project_id):
+    db = get_db()
+    require_role(db, project_id, session["user_id"], "viewer")
+    fields = task_fields()
+    limit = parse_limit(request.args.get("limit"))
+    after = parse_cursor(request.args.get("after"))
+
+    query = db.query(Task).filter(Task.project_id == project_id)
+    if "parent_id" in request.args:
+        # parent_id rỗng: chỉ lấy task gốc
+        parent_id = parse_cursor(request.args["parent_id"])
+        query = query.filter(Task.parent_id == parent_id if parent_id is not None else Task.parent_id.is_(None))
+    if request.args.get("completed") in ("true", "false"):
+        query = query.filter(Task.completed == (request.args["completed"] == "true"))
+    if after is not None:
+        query = query.filter(Task.id > after)
+    if "tags" in fields:
+        # Nạp tag theo lô chỉ khi client yêu cầu trường tags
+        query = query.options(selectinload(Task.tags))
+    tasks, next_cursor = page_of(query.order_by(Task.id).limit(limit + 1).all(), limit)
+    return jsonify({"data": [serialize_task(task, fields) for task in tasks], "next_cursor": next_cursor})
+
+@api_bp.route("/projects/<int:project_id>/tasks", methods=["POST"])
+def create_project_task(project_id):
+    db = get_db()
+    fields = task_fields()
+    task = create_task(db, project_id, session["user_id"], json_body())
+    db.commit()
+    return jsonify({"data": serialize_task(task, fields)}), 201
+
+@api_bp.route("/projects/<int:project_id>/shares")
+def list_shares(project_id):
+    db = get_db()
+    require_role(db, project_id, session["user_id"], "owner")
+    shares = db.query(ProjectShare).filter_by(project_id=project_id).order_by(ProjectShare.id).all()
+    return jsonify({"data": [{name: getattr(share, name) for name in SHARE_FIELDS} for share in shares]})
+
+@api_bp.route("/tasks/<int:task_id>")
+def get_single_task(task_id):
+    task = get_task(get_db(), task_id, session["user_id"], "viewer")
+    return jsonify({"data": serialize_task(task, task_fields())})
+
+@api_bp.route("/tasks/<int:task_id>", methods=["PATCH"])
+def update_single_task(task_id):
+    db = get_db()
+    fields = task_fields()
+    task = update_task(db, task_id, session["user_id"], json_body())
+    db.commit()
+    return jsonify({"data": serialize_task(task, fields)})
+
+@api_bp.route("/tasks/<int:task_id>/toggle", methods=["POST"])
+def toggle_single_task(task_id):
+    db = get_db()
+    fields = task_fields()
+    # Thân request là tuỳ chọn; không có thì đảo trạng thái hiện tại
+    data = json_body() if request.get_data() else {}
+    task = toggle_task(db, task_id, session["user_id"], data)
+    db.commit()
+    return jsonify({"data": serialize_task(task, fields)})
+
+@api_bp.route("/tasks/<int:task_id>", methods=["DELETE"])
+def delete_single_task(task_id):
+    db = get_db()
+    delete_task(db, task_id, session["user_id"])
+    db.commit()
+    return "", 204
+
+@api_bp.route("/batch", methods=["POST"])
+def batch():
+    """Nhiều thao tác create/update/toggle/delete trong một transaction: tất cả hoặc không gì cả."""
+    results = run_batch(get_db(), session["user_id"], json_body().get("operations"), task_fields())
+    return jsonify({"data": results})
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 from database import get_db
 from models.user import User
+from services.avatars import avatar_variant
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -16,7 +17,7 @@ def login():
             flash("Username and password are required", "error")
             return redirect(url_for("auth.login"))
 
-        db = next(get_db())
+        db = get_db()
         user = db.query(User).filter_by(username=username).first()
         print(f"User found: {user}")
 
@@ -25,6 +26,7 @@ def login():
             session["user_id"] = user.id
             session["username"] = user.username
             session["is_admin"] = user.is_admin
+            session["avatar_url"] = avatar_variant(user.avatar_url, "sm")
             flash("Login successful!", "success")
             print(f"Redirecting to: {'admin.admin_dashboard' if user.is_admin else 'project.dashboard'}")
             if user.is_admin:
@@ -49,7 +51,7 @@ def register():
             flash("Username and password are required", "error")
             return redirect(url_for("auth.register"))
 
-        db = next(get_db())
+        db = get_db()
         if db.query(User).filter_by(username=username).first():
             print(f"Username {username} already taken")
             flash("Username already taken", "error")
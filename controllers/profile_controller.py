@@ -1,13 +1,10 @@
 from flask import Blueprint, render_template, session, redirect, url_for, request, flash
 from database import get_db
 from models.user import User
-from models.project import Project
-from models.task import Task
-from sqlalchemy import func
-from werkzeug.utils import secure_filename
-import os
-from utils import allowed_file, UPLOAD_FOLDER
-import uuid
+from utils import allowed_file
+from services.theme import invalidate_user_theme
+from services.avatars import save_avatar, delete_avatar, avatar_variant, InvalidAvatar
+from services.user_stats import get_user_stats
 
 profile_bp = Blueprint("profile", __name__, url_prefix="/profile")
 
@@ -18,22 +15,17 @@ def view_profile():
         return redirect(url_for("auth.login"))
 
     try:
-        db = next(get_db())
+        db = get_db()
         user = db.query(User).get(session["user_id"])
         if not user:
             flash("User not found. Please log in again.", "error")
             session.clear()
             return redirect(url_for("auth.login"))
-        project_count = db.query(func.count(Project.id)).filter(Project.owner_id == user.id).scalar() or 0
-        task_count = db.query(func.count(Task.id)).filter(Task.owner_id == user.id).scalar() or 0
-        completed_tasks = db.query(func.count(Task.id)).filter(Task.owner_id == user.id, Task.completed == True).scalar() or 0
 
         return render_template(
             "profile.html",
             user=user,
-            project_count=project_count,
-            task_count=task_count,
-            completed_tasks=completed_tasks
+            stats=get_user_stats(db, user.id)
         )
     except Exception as e:
         flash(f"Error loading profile: {str(e)}", "error")
@@ -46,7 +38,7 @@ def edit_profile():
         return redirect(url_for("auth.login"))
 
     try:
-        db = next(get_db())
+        db = get_db()
         user = db.query(User).get(session["user_id"])
         if not user:
             flash("User not found. Please log in again.", "error")
@@ -77,15 +69,22 @@ def edit_profile():
                 flash("Invalid theme selected.", "error")
                 return render_template("profile_edit.html", user=user)
 
+            old_avatar_url = user.avatar_url
             if 'avatar' in request.files:
                 file = request.files['avatar']
                 if file and allowed_file(file.filename):
-                    ext = secure_filename(file.filename).rsplit('.', 1)[1].lower()
-                    filename = f"avatar_{user.id}_{uuid.uuid4().hex}.{ext}"
-                    file.save(os.path.join(UPLOAD_FOLDER, filename))
+                    try:
+                        filename = save_avatar(file, user.id)
+                    except InvalidAvatar as e:
+                        flash(str(e), "error")
+                        return render_template("profile_edit.html", user=user)
                     user.avatar_url = url_for('uploaded_file', filename=filename, _external=False)
 
             db.commit()
+            invalidate_user_theme(user.id)
+            session["avatar_url"] = avatar_variant(user.avatar_url, "sm")
+            if old_avatar_url and old_avatar_url != user.avatar_url:
+                delete_avatar(old_avatar_url)
             flash("Profile updated successfully!", "success")
             return redirect(url_for("profile.view_profile"))
 
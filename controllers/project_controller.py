@@ -1,13 +1,15 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response, g, stream_with_context
 from database import get_db
 from models.user import User
 from models.project import Project
-from models.task import Task
 from models.project_share import ProjectShare
-from sqlalchemy.orm import joinedload
-from datetime import datetime
-import csv
-from io import StringIO
+from services.task_tree import build_task_tree
+from services.search import match_projects
+from services.permissions import require_project_role, accessible_project_ids
+from services.export import EXPORT_FORMATS, stream_tasks
+from services.importer import import_tasks
+from services.http_cache import page_validators, conditional, project_version, dashboard_version
+import io
 
 project_bp = Blueprint("project", __name__, url_prefix="/project")
 
@@ -17,20 +19,20 @@ def dashboard():
         flash("Please log in to view your dashboard.", "info")
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     user_id = session["user_id"]
-    
-    search_query = request.args.get("search", "")
-    projects = db.query(Project).filter_by(owner_id=user_id)
-    if search_query:
-        projects = projects.filter(Project.title.like(f"%{search_query}%"))
-    projects = projects.all()
-    
-    for p in projects:
-        total_tasks = len(p.tasks)
-        p.progress = int((sum(1 for task in p.tasks if task.completed) / total_tasks) * 100) if total_tasks > 0 else 0
-
-    return render_template("project/dashboard.html", projects=projects, search_query=search_query)
+    version, last_modified = dashboard_version(db, user_id)
+
+    def render():
+        search_query = request.args.get("search", "")
+        projects = db.query(Project).filter_by(owner_id=user_id)
+        if search_query:
+            matches = match_projects(search_query)
+            projects = projects.join(matches, matches.c.id == Project.id).order_by(matches.c.rank)
+        projects = projects.all()
+        return render_template("project/dashboard.html", projects=projects, search_query=search_query, export_formats=EXPORT_FORMATS)
+
+    return conditional(page_validators(version, last_modified=last_modified), render)
 
 @project_bp.route("/create", methods=["GET", "POST"])
 def create_project():
@@ -45,7 +47,7 @@ def create_project():
             flash("Project title is required.", "error")
             return redirect(url_for("project.create_project"))
 
-        db = next(get_db())
+        db = get_db()
         if db.query(Project).filter_by(title=title, owner_id=session["user_id"]).first():
             flash("Project title already exists.", "error")
             return redirect(url_for("project.create_project"))
@@ -63,7 +65,7 @@ def edit_project(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     project = db.query(Project).filter_by(id=project_id, owner_id=session["user_id"]).first()
     if not project:
         flash("Project not found or you don't have access.", "error")
@@ -89,54 +91,28 @@ def edit_project(project_id):
     return render_template("project/edit_project.html", project=project)
 
 @project_bp.route("/<int:project_id>")
+@require_project_role("viewer", missing_message="Project not found.")
 def view_project(project_id):
-    if "user_id" not in session:
-        return redirect(url_for("auth.login"))
+    db = get_db()
+    role = g.project_role
+    version, last_modified = project_version(db, project_id)
 
-    db = next(get_db())
-    project = db.query(Project).options(joinedload(Project.tasks)).filter_by(id=project_id).first()
-    if not project:
-        flash("Project not found.", "error")
-        return redirect(url_for("project.dashboard"))
-
-    # Kiểm tra quyền: owner hoặc shared user
-    is_owner = project.owner_id == session["user_id"]
-    share = db.query(ProjectShare).filter_by(project_id=project_id, user_id=session["user_id"]).first()
-    if not (is_owner or share):
-        flash("You don't have access to this project.", "error")
-        return redirect(url_for("project.dashboard"))
+    def render():
+        project = db.query(Project).filter_by(id=project_id).first()
+        search_query = request.args.get("search", "")
+        completed_filter = request.args.get("completed", None)
+        page = request.args.get("page", 1, type=int)
+        task_page = build_task_tree(db, project_id, search_query, completed_filter, page)
+        return render_template("project/project_detail.html", project=project, tasks=task_page.tasks, task_page=task_page, role=role, search_query=search_query, completed_filter=completed_filter, export_formats=EXPORT_FORMATS)
 
-    role = share.role if share else 'owner'
-
-    search_query = request.args.get("search", "")
-    completed_filter = request.args.get("completed", None)
-    tasks = db.query(Task).filter_by(project_id=project_id)
-    if search_query:
-        tasks = tasks.filter(Task.title.like(f"%{search_query}%"))
-    if completed_filter is not None:
-        tasks = tasks.filter(Task.completed == (completed_filter == "true"))
-    tasks = sorted(tasks.all(), key=lambda t: (t.parent_id or -1, {'high': 0, 'medium': 1, 'low': 2}.get(t.priority, 1)))
-
-    tasks_tree = {t.id: t for t in tasks}
-    nested_tasks = []
-    for t in tasks:
-        if t.parent_id:
-            parent = tasks_tree.get(t.parent_id)
-            if parent:
-                if not hasattr(parent, 'subtasks_list'):
-                    parent.subtasks_list = []
-                parent.subtasks_list.append(t)
-        else:
-            nested_tasks.append(t)
-
-    return render_template("project/project_detail.html", project=project, tasks=nested_tasks, role=role, search_query=search_query, completed_filter=completed_filter)
+    return conditional(page_validators(version, role, last_modified=last_modified), render)
 
 @project_bp.route("/delete/<int:project_id>", methods=["POST"])
 def delete_project(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     project = db.query(Project).filter_by(id=project_id, owner_id=session["user_id"]).first()
     if not project:
         flash("Project not found or you don't have permission.", "error")
@@ -152,7 +128,7 @@ def invite_user(project_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     project = db.query(Project).filter_by(id=project_id, owner_id=session["user_id"]).first()
     if not project:
         flash("Project not found or you don't have permission.", "error")
@@ -181,30 +157,51 @@ def invite_user(project_id):
     return render_template("project/invite_user.html", project=project)
 
 @project_bp.route("/export/<int:project_id>")
+@require_project_role("owner", "Project not found or you don't have access.")
 def export_project(project_id):
+    export_format = EXPORT_FORMATS.get(request.args.get("format", "csv"))
+    if not export_format:
+        flash("Unsupported export format.", "error")
+        return redirect(url_for("project.view_project", project_id=project_id))
+
+    db = get_db()
+    project = db.get(Project, project_id)
+    return Response(
+        stream_with_context(stream_tasks(export_format, [project_id])),
+        mimetype=export_format.mimetype,
+        headers={"Content-Disposition": f"attachment;filename={project.title}_tasks.{export_format.extension}"}
+    )
+
+@project_bp.route("/export")
+def export_all_projects():
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
-    project = db.query(Project).filter_by(id=project_id, owner_id=session["user_id"]).first()
-    if not project:
-        flash("Project not found or you don't have access.", "error")
+    export_format = EXPORT_FORMATS.get(request.args.get("format", "csv"))
+    if not export_format:
+        flash("Unsupported export format.", "error")
         return redirect(url_for("project.dashboard"))
 
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Task ID", "Title", "Description", "Due Date", "Completed", "Priority", "Parent ID", "Tags"])
-    for task in project.tasks:
-        tags = ",".join(tag.name for tag in task.tags)
-        writer.writerow([
-            task.id, task.title, task.description,
-            task.due_date.strftime('%Y-%m-%d') if task.due_date else "",
-            task.completed, task.priority, task.parent_id or "", tags
-        ])
-    
-    output.seek(0)
     return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment;filename={project.title}_tasks.csv"}
-    )
\ No newline at end of file
+        stream_with_context(stream_tasks(export_format, accessible_project_ids(session["user_id"]), include_project=True)),
+        mimetype=export_format.mimetype,
+        headers={"Content-Disposition": f"attachment;filename=all_projects_tasks.{export_format.extension}"}
+    )
+
+@project_bp.route("/import/<int:project_id>", methods=["POST"])
+@require_project_role("editor", "You don't have permission to import tasks into this project.")
+def import_project_tasks(project_id):
+    file = request.files.get("file")
+    if not file or not file.filename:
+        flash("Please choose a CSV or JSONL file to import.", "error")
+        return redirect(url_for("project.view_project", project_id=project_id))
+
+    file_format = "jsonl" if file.filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    stream = io.TextIOWrapper(file.stream, encoding="utf-8-sig", newline="")
+    report = import_tasks(get_db(), project_id, session["user_id"], stream, file_format)
+
+    flash(f"Imported {report.imported} tasks.", "success")
+    if report.error_count:
+        details = "; ".join(f"line {line}: {message}" for line, message in report.errors[:5])
+        flash(f"{report.error_count} rows were skipped or imported with warnings. {details}", "error")
+    return redirect(url_for("project.view_project", project_id=project_id))
@@ -0,0 +1,41 @@
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from database import get_db
+from services.search import search_accessible
+from datetime import datetime, timedelta
+
+search_bp = Blueprint("search", __name__, url_prefix="/search")
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d") if value else None
+    except ValueError:
+        return None
+
+@search_bp.route("/")
+def search():
+    if "user_id" not in session:
+        flash("Please log in to search.", "info")
+        return redirect(url_for("auth.login"))
+
+    params = {
+        "q": request.args.get("q", "").strip(),
+        "tag": request.args.get("tag", "").strip(),
+        "priority": request.args.get("priority", ""),
+        "due_from": request.args.get("due_from", ""),
+        "due_to": request.args.get("due_to", ""),
+    }
+    due_to = parse_date(params["due_to"])
+
+    db = get_db()
+    results = search_accessible(
+        db, session["user_id"],
+        search_query=params["q"],
+        tag=params["tag"] or None,
+        priority=params["priority"] if params["priority"] in ("low", "medium", "high") else None,
+        due_from=parse_date(params["due_from"]),
+        # Ngày kết thúc được tính trọn ngày
+        due_to=due_to + timedelta(days=1) if due_to else None,
+        cursor=request.args.get("after"),
+    )
+    params = {key: value for key, value in params.items() if value}
+    return render_template("search/results.html", results=results, params=params)
@@ -1,42 +1,37 @@
 from flask import Blueprint, request, redirect, url_for, session, flash, render_template
 from database import get_db
 from models.task import Task
-from models.tag import Tag
-from models.user import User
-from models.project import Project
-from models.project_share import ProjectShare
-from datetime import datetime, timedelta
+from services.task_ops import set_subtree_completed, set_subtrees_completed, set_priority, retag, delete_subtrees
+from services.tag_service import set_task_tags
+from services.permissions import can_edit_project, require_project_role
+from services.scheduler import request_run
+from datetime import datetime
 
 task_bp = Blueprint("task", __name__, url_prefix="/task")
 
+PRIORITIES = ("low", "medium", "high")
+
+def parse_priority(value):
+    """Độ ưu tiên từ form: để trống là 'medium', giá trị lạ trả về None."""
+    value = value or "medium"
+    return value if value in PRIORITIES else None
+
 def parse_tags(tag_input):
     """Parse comma-separated tag input into a list of tag names."""
     return [tag.strip() for tag in tag_input.split(",") if tag.strip()]
 
 def has_project_edit_permission(db, project_id, user_id):
     """Kiểm tra xem user có quyền edit trên project (owner hoặc share role 'editor')"""
-    project = db.query(Project).filter_by(id=project_id).first()
-    if not project:
-        return False
-    if project.owner_id == user_id:
-        return True
-    share = db.query(ProjectShare).filter_by(project_id=project_id, user_id=user_id).first()
-    return share and share.role == 'editor'
+    return can_edit_project(db, project_id, user_id)
 
 @task_bp.route("/create/<int:project_id>", methods=["POST"])
+@require_project_role("editor", "You don't have permission to create tasks in this project.")
 def create_task(project_id):
-    if "user_id" not in session:
-        return redirect(url_for("auth.login"))
-
-    db = next(get_db())
-    if not has_project_edit_permission(db, project_id, session["user_id"]):
-        flash("You don't have permission to create tasks in this project.", "error")
-        return redirect(url_for("project.view_project", project_id=project_id))
-
+    db = get_db()
     title = request.form.get("title")
     description = request.form.get("description")
     due_date_str = request.form.get("due_date")
-    priority = request.form.get("priority")
+    priority = parse_priority(request.form.get("priority"))
     parent_id = request.form.get("parent_id")
     tag_input = request.form.get("tags", "")
     tag_names = parse_tags(tag_input) if tag_input else []
@@ -44,6 +39,10 @@ def create_task(project_id):
     if not title:
         flash("Task title is required.", "error")
         return redirect(url_for("project.view_project", project_id=project_id))
+
+    if priority is None:
+        flash("Invalid priority.", "error")
+        return redirect(url_for("project.view_project", project_id=project_id))
         
     if db.query(Task).filter_by(title=title, project_id=project_id).first():
         flash("Task title already exists in this project.", "error")
@@ -60,14 +59,8 @@ def create_task(project_id):
         parent_id=int(parent_id) if parent_id else None
     )
 
-    for tag_name in tag_names:
-        tag = db.query(Tag).filter_by(name=tag_name).first()
-        if not tag:
-            tag = Tag(name=tag_name)
-            db.add(tag)
-        new_task.tags.append(tag)
-
     db.add(new_task)
+    set_task_tags(db, new_task, tag_names, replace=False)
     db.commit()
     flash("New task added successfully!", "success")
     return redirect(url_for("project.view_project", project_id=project_id))
@@ -77,7 +70,7 @@ def create_subtask(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     parent_task = db.query(Task).filter_by(id=task_id).first()
     if not parent_task:
         flash("Parent task not found.", "error")
@@ -91,7 +84,7 @@ def create_subtask(task_id):
         title = request.form.get("title")
         description = request.form.get("description")
         due_date_str = request.form.get("due_date")
-        priority = request.form.get("priority")
+        priority = parse_priority(request.form.get("priority"))
         tag_input = request.form.get("tags", "")
         tag_names = parse_tags(tag_input) if tag_input else []
 
@@ -99,6 +92,10 @@ def create_subtask(task_id):
             flash("Sub-task title is required.", "error")
             return render_template("task/create_subtask.html", parent_task=parent_task)
 
+        if priority is None:
+            flash("Invalid priority.", "error")
+            return render_template("task/create_subtask.html", parent_task=parent_task)
+
         if db.query(Task).filter_by(title=title, project_id=parent_task.project_id).first():
             flash("Task title already exists in this project.", "error")
             return render_template("task/create_subtask.html", parent_task=parent_task)
@@ -114,14 +111,8 @@ def create_subtask(task_id):
             parent_id=task_id
         )
 
-        for tag_name in tag_names:
-            tag = db.query(Tag).filter_by(name=tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-            new_subtask.tags.append(tag)
-
         db.add(new_subtask)
+        set_task_tags(db, new_subtask, tag_names, replace=False)
         db.commit()
         flash("New sub-task added successfully!", "success")
         return redirect(url_for("project.view_project", project_id=parent_task.project_id))
@@ -133,7 +124,7 @@ def edit_task(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     task = db.query(Task).filter_by(id=task_id).first()
     if not task:
         flash("Task not found.", "error")
@@ -147,7 +138,7 @@ def edit_task(task_id):
         title = request.form.get("title")
         description = request.form.get("description")
         due_date_str = request.form.get("due_date")
-        priority = request.form.get("priority")
+        priority = parse_priority(request.form.get("priority"))
         tag_input = request.form.get("tags", "")
         tag_names = parse_tags(tag_input) if tag_input else []
 
@@ -155,6 +146,10 @@ def edit_task(task_id):
             flash("Task title is required.", "error")
             return render_template("task/edit_task.html", task=task, tags_string=','.join(tag.name for tag in task.tags))
 
+        if priority is None:
+            flash("Invalid priority.", "error")
+            return render_template("task/edit_task.html", task=task, tags_string=','.join(tag.name for tag in task.tags))
+
         if db.query(Task).filter_by(title=title, project_id=task.project_id).filter(Task.id != task_id).first():
             flash("Task title already exists in this project.", "error")
             return render_template("task/edit_task.html", task=task, tags_string=','.join(tag.name for tag in task.tags))
@@ -164,14 +159,7 @@ def edit_task(task_id):
         task.description = description
         task.due_date = due_date
         task.priority = priority
-        task.tags.clear() 
-        for tag_name in tag_names:
-            tag = db.query(Tag).filter_by(name=tag_name).first()
-            if not tag:
-                tag = Tag(name=tag_name)
-                db.add(tag)
-            task.tags.append(tag)
-        
+        set_task_tags(db, task, tag_names)
         db.commit()
         flash("Task updated successfully!", "success")
         return redirect(url_for("project.view_project", project_id=task.project_id))
@@ -180,18 +168,12 @@ def edit_task(task_id):
     tags_string = ','.join(tag.name for tag in task.tags) if task.tags else ''
     return render_template("task/edit_task.html", task=task, tags_string=tags_string)
 
-def update_subtasks_status(task, status):
-    """Cập nhật đệ quy trạng thái hoàn thành của tất cả các sub-task."""
-    for subtask in task.subtasks:
-        subtask.completed = status
-        update_subtasks_status(subtask, status)
-
 @task_bp.route("/toggle/<int:task_id>", methods=["POST"]) 
 def toggle_complete(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     task = db.query(Task).filter_by(id=task_id).first()
     if not task:
         flash("Task not found.", "error")
@@ -200,20 +182,18 @@ def toggle_complete(task_id):
     if not has_project_edit_permission(db, task.project_id, session["user_id"]):
         flash("You don't have permission to update this task.", "error")
         return redirect(url_for("project.view_project", project_id=task.project_id))
-    new_status = not task.completed
-    task.completed = new_status
-    update_subtasks_status(task, new_status)
-    
+    title, project_id = task.title, task.project_id
+    set_subtree_completed(db, task, not task.completed)
     db.commit()
-    flash(f"Task '{task.title}' and its subtasks have been updated.", "success")
-    return redirect(url_for("project.view_project", project_id=task.project_id))
+    flash(f"Task '{title}' and its subtasks have been updated.", "success")
+    return redirect(url_for("project.view_project", project_id=project_id))
 
 @task_bp.route("/delete/<int:task_id>", methods=["POST"])
 def delete_task(task_id):
     if "user_id" not in session:
         return redirect(url_for("auth.login"))
 
-    db = next(get_db())
+    db = get_db()
     task = db.query(Task).filter_by(id=task_id).first()
     if not task:
         flash("Task not found.", "error")
@@ -229,29 +209,52 @@ def delete_task(task_id):
     flash(f"Task '{task.title}' has been deleted.", "success")
     return redirect(url_for("project.view_project", project_id=project_id))
 
-@task_bp.route("/check_reminders")
-def check_reminders():
-    from app import mail
-    from flask_mail import Message
-
-    db = next(get_db())
-    tomorrow = datetime.now() + timedelta(days=1)
-    tasks = db.query(Task).filter(
-        Task.due_date <= tomorrow,
-        Task.completed == False,
-        Task.reminder_sent == False
-    ).all()
-
-    for task in tasks:
-        user = db.query(User).filter_by(id=task.owner_id).first()
-        if user:
-            msg = Message(
-                subject=f"Reminder: Task '{task.title}' is due soon",
-                recipients=[user.email],
-                body=f"Task '{task.title}' in project '{task.project.title}' is due on {task.due_date.strftime('%Y-%m-%d')}. Please complete it soon!"
-            )
-            mail.send(msg)
-            task.reminder_sent = True
+@task_bp.route("/bulk/<int:project_id>", methods=["POST"])
+@require_project_role("editor", "You don't have permission to update tasks in this project.")
+def bulk_update(project_id):
+    """Áp dụng một thao tác cho nhiều task đã chọn: quyền kiểm tra một lần, một transaction."""
+    db = get_db()
+    task_ids = request.form.getlist("task_ids", type=int)
+    action = request.form.get("action")
+    # Quay lại đúng trang và bộ lọc đang xem
+    back = redirect(url_for(
+        "project.view_project", project_id=project_id,
+        page=request.form.get("page", type=int),
+        search=request.form.get("search") or None,
+        completed=request.form.get("completed") or None,
+    ))
+
+    if not task_ids:
+        flash("Select at least one task.", "error")
+        return back
+
+    if action == "complete":
+        changed = set_subtrees_completed(db, project_id, task_ids, True)
+    elif action == "incomplete":
+        changed = set_subtrees_completed(db, project_id, task_ids, False)
+    elif action == "priority":
+        priority = request.form.get("priority")
+        if priority not in PRIORITIES:
+            flash("Invalid priority.", "error")
+            return back
+        changed = set_priority(db, project_id, task_ids, priority)
+    elif action == "retag":
+        changed = retag(db, project_id, task_ids, parse_tags(request.form.get("tags", "")))
+    elif action == "delete":
+        changed = delete_subtrees(db, project_id, task_ids)
+    else:
+        flash("Unknown bulk action.", "error")
+        return back
 
     db.commit()
-    return "Reminders checked and sent."
\ No newline at end of file
+    verb = "deleted" if action == "delete" else "updated"
+    flash(f"{changed} task{'s' if changed != 1 else ''} {verb}.", "success")
+    return back
+
+@task_bp.route("/check_reminders", methods=["POST"])
+def check_reminders():
+    if not session.get("is_admin"):
+        return "Forbidden", 403
+    # Không gửi trực tiếp: job "reminders" chỉ chạy trên worker giữ lease trong scheduled_jobs
+    request_run(get_db(), "reminders")
+    return "Reminder dispatch scheduled.", 202
@@ -1,21 +1,86 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import sessionmaker, declarative_base, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
+from flask import g, has_app_context, request, has_request_context
+from config import (
+    DATABASE_URL, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS,
+    SQLITE_BUSY_TIMEOUT, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+)
 
-DATABASE_URL = "sqlite:///./todo.db"
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    finally:
+        cursor.close()
+
+def _engine_options(url):
+    """Tham số kết nối và pool phù hợp với từng backend."""
+    pool_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() != "sqlite":
+        return pool_options
+    options = {"connect_args": {"check_same_thread": False}}
+    if url.database in (None, "", ":memory:"):
+        # Một kết nối duy nhất, nếu không mỗi kết nối sẽ thấy một DB rỗng khác nhau
+        options["poolclass"] = StaticPool
+    else:
+        options.update(pool_options)
+    return options
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def create_db_engine(url=DATABASE_URL):
+    """Tạo engine dùng chung cho toàn bộ ứng dụng (app, models, migrate)."""
+    url = make_url(url)
+    engine = create_engine(url, **_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+engine = create_db_engine()
 
 Base = declarative_base()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Session theo request: mỗi thread xử lý request dùng chung một session,
+# session được đóng ở teardown_appcontext (xem init_app)
+db_session = scoped_session(SessionLocal)
+
 def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    except SQLAlchemyError as e:
-        print(f"Lỗi cơ sở dữ liệu: {e}")
-        raise
-    finally:
-        db.close()
\ No newline at end of file
+    """Trả về session của request hiện tại."""
+    return db_session()
+
+@event.listens_for(SessionLocal, "after_begin")
+def _track_session(session, transaction, connection):
+    if has_app_context():
+        g.setdefault("_db_sessions", set()).add(session)
+        if has_request_context():
+            g.setdefault("_db_request_path", request.path)
+
+def init_app(app):
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        if exception is not None:
+            if isinstance(exception, SQLAlchemyError):
+                print(f"Lỗi cơ sở dữ liệu: {exception}")
+            db_session.rollback()
+        db_session.remove()
+
+        # Phát hiện rò rỉ: session nào còn transaction mở sau khi request kết thúc
+        leaked = [s for s in g.pop("_db_sessions", ()) if s.in_transaction()]
+        if leaked:
+            where = g.pop("_db_request_path", None) or "app context"
+            app.logger.warning("%d database session(s) still open at the end of %s", len(leaked), where)
+            for session in leaked:
+                session.close()
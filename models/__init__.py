@@ -1,6 +1,10 @@
 from .user import User
 from .project import Project
 from .task import Task
+from .tag import Tag
+from .project_share import ProjectShare
+from .scheduled_job import ScheduledJob
+from . import counters
 from database import Base, engine
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -12,4 +16,4 @@ def init_db():
     except SQLAlchemyError as e:
         print(f"Lỗi khi tạo bảng: {e}")
     except Exception as e:
-        print(f"Đã xảy ra lỗi không xác định: {e}")
\ No newline at end of file
+        print(f"Đã xảy ra lỗi không xác định: {e}")
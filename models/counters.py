@@ -0,0 +1,69 @@
+from sqlalchemy import event, update, select, func, inspect
+from .project import Project
+from .task import Task
+
+projects_table = Project.__table__
+tasks_table = Task.__table__
+
+def adjust_project_counters(connection, project_id, total=0, completed=0):
+    """Cộng dồn thay đổi vào task_count / completed_count của một project."""
+    if not project_id or not (total or completed):
+        return
+    connection.execute(
+        update(projects_table)
+        .where(projects_table.c.id == project_id)
+        .values(
+            task_count=projects_table.c.task_count + total,
+            completed_count=projects_table.c.completed_count + completed,
+            # Giữ nguyên updated_at, bộ đếm không phải là chỉnh sửa project
+            updated_at=projects_table.c.updated_at,
+        )
+    )
+
+@event.listens_for(Task, "after_insert")
+def _task_inserted(mapper, connection, target):
+    adjust_project_counters(connection, target.project_id, 1, 1 if target.completed else 0)
+
+@event.listens_for(Task, "after_delete")
+def _task_deleted(mapper, connection, target):
+    adjust_project_counters(connection, target.project_id, -1, -1 if target.completed else 0)
+
+@event.listens_for(Task, "after_update")
+def _task_updated(mapper, connection, target):
+    state = inspect(target)
+    completed_hist = state.attrs.completed.history
+    project_hist = state.attrs.project_id.history
+    if not completed_hist.has_changes() and not project_hist.has_changes():
+        return
+
+    old_completed = bool(completed_hist.deleted[0]) if completed_hist.deleted else bool(target.completed)
+    old_project_id = project_hist.deleted[0] if project_hist.deleted else target.project_id
+
+    if old_project_id != target.project_id:
+        adjust_project_counters(connection, old_project_id, -1, -1 if old_completed else 0)
+        adjust_project_counters(connection, target.project_id, 1, 1 if target.completed else 0)
+    elif old_completed != bool(target.completed):
+        adjust_project_counters(connection, target.project_id, 0, 1 if target.completed else -1)
+
+def repair_project_counters(db, project_ids=None):
+    """Tính lại toàn bộ bộ đếm bằng một câu UPDATE với subquery tương quan."""
+    total = (
+        select(func.count(tasks_table.c.id))
+        .where(tasks_table.c.project_id == projects_table.c.id)
+        .scalar_subquery()
+    )
+    completed = (
+        select(func.count(tasks_table.c.id))
+        .where(tasks_table.c.project_id == projects_table.c.id, tasks_table.c.completed == True)
+        .scalar_subquery()
+    )
+    stmt = update(projects_table).values(
+        task_count=total,
+        completed_count=completed,
+        updated_at=projects_table.c.updated_at,
+    )
+    if project_ids is not None:
+        stmt = stmt.where(projects_table.c.id.in_(list(project_ids)))
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
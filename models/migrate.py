@@ -1,10 +1,12 @@
-from sqlalchemy import create_engine, MetaData
+import sys
+from sqlalchemy import MetaData, text, select, func
 from datetime import datetime
-DATABASE_URL = "sqlite:///./todo.db"  
+from database import Base, engine
+from models import Task, Project, ProjectShare
+from models.task import task_tags
 
 def migrate():
     try:
-        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
         metadata = MetaData()
         metadata.reflect(bind=engine)
 
@@ -14,10 +16,10 @@ def migrate():
         elif "updated_at" not in projects.c:
             print("Adding updated_at column to projects table...")
             with engine.connect() as connection:
-                connection.execute("ALTER TABLE projects ADD COLUMN updated_at DATETIME")
+                connection.execute(text("ALTER TABLE projects ADD COLUMN updated_at DATETIME"))
                 connection.execute(
-                    "UPDATE projects SET updated_at = ? WHERE updated_at IS NULL",
-                    (datetime.utcnow(),)
+                    text("UPDATE projects SET updated_at = :now WHERE updated_at IS NULL"),
+                    {"now": datetime.utcnow()}
                 )
                 connection.commit()
             print("Added updated_at to projects table.")
@@ -30,19 +32,84 @@ def migrate():
         elif "updated_at" not in tasks.c:
             print("Adding updated_at column to tasks table...")
             with engine.connect() as connection:
-                connection.execute("ALTER TABLE tasks ADD COLUMN updated_at DATETIME")
+                connection.execute(text("ALTER TABLE tasks ADD COLUMN updated_at DATETIME"))
                 connection.execute(
-                    "UPDATE tasks SET updated_at = ? WHERE updated_at IS NULL",
-                    (datetime.utcnow(),)
+                    text("UPDATE tasks SET updated_at = :now WHERE updated_at IS NULL"),
+                    {"now": datetime.utcnow()}
                 )
                 connection.commit()
             print("Added updated_at to tasks table.")
         else:
             print("updated_at column already exists in tasks table.")
 
+        ensure_indexes()
         print("Migration completed successfully.")
     except Exception as e:
         print(f"Error during migration: {e}")
 
+def ensure_indexes():
+    """Tạo các index khai báo trong models mà DB hiện có còn thiếu."""
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    created = False
+    for table in Base.metadata.sorted_tables:
+        existing = metadata.tables.get(table.name)
+        if existing is None:
+            continue
+        existing_names = {index.name for index in existing.indexes}
+        for index in table.indexes:
+            if index.name in existing_names:
+                continue
+            if index.unique and table.name == "task_tags" and engine.dialect.name == "sqlite":
+                # Xoá liên kết task-tag trùng lặp trước khi thêm ràng buộc unique
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        "DELETE FROM task_tags WHERE rowid NOT IN "
+                        "(SELECT MIN(rowid) FROM task_tags GROUP BY task_id, tag_id)"
+                    ))
+            print(f"Creating index {index.name} on {table.name}...")
+            index.create(bind=engine, checkfirst=True)
+            created = True
+    if created and engine.dialect.name == "sqlite":
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+# Các truy vấn nóng cần được phục vụ bởi index
+HOT_QUERIES = {
+    "duplicate task title": select(Task.id).where(Task.project_id == 1, Task.title == "x"),
+    "project root tasks": select(Task.id).where(Task.project_id == 1, Task.parent_id.is_(None)),
+    "subtasks of a task": select(Task.id).where(Task.parent_id == 1),
+    "tasks owned by user": select(Task.id).where(Task.owner_id == 1),
+    "latest task change in project": select(func.max(Task.updated_at)).where(Task.project_id == 1),
+    "due reminders": select(Task.id).where(
+        Task.completed == False, Task.reminder_sent == False, Task.due_date <= datetime(2000, 1, 1)
+    ),
+    "projects owned by user": select(Project.id).where(Project.owner_id == 1),
+    "duplicate project title": select(Project.id).where(Project.owner_id == 1, Project.title == "x"),
+    "project share check": select(ProjectShare.role).where(ProjectShare.project_id == 1, ProjectShare.user_id == 1),
+    "projects shared with user": select(ProjectShare.project_id).where(ProjectShare.user_id == 1),
+    "tags of a task": select(task_tags.c.tag_id).where(task_tags.c.task_id == 1),
+    "tasks with a tag": select(task_tags.c.task_id).where(task_tags.c.tag_id == 1),
+}
+
+def advise_indexes():
+    """Chạy EXPLAIN QUERY PLAN cho các truy vấn nóng, trả về những truy vấn quét toàn bảng."""
+    if engine.dialect.name != "sqlite":
+        print("Index advisor only supports SQLite.")
+        return {}
+    full_scans = {}
+    with engine.connect() as connection:
+        for name, query in HOT_QUERIES.items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            scans = [step for step in plan if step.startswith("SCAN") and "INDEX" not in step]
+            status = "FULL SCAN" if scans else "ok"
+            print(f"[{status}] {name}: {'; '.join(plan)}")
+            if scans:
+                full_scans[name] = plan
+    return full_scans
+
 if __name__ == "__main__":
+    if sys.argv[1:] == ["advise"]:
+        sys.exit(1 if advise_indexes() else 0)
     migrate()
\ No newline at end of file
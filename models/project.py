@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_owner_title", "owner_id", "title"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(150), nullable=False)
@@ -12,8 +15,18 @@ class Project(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bộ đếm phi chuẩn hoá, được cập nhật bởi models/counters.py
+    task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Quan hệ
     owner = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
-    shares = relationship("ProjectShare", back_populates="project", cascade="all, delete-orphan")
\ No newline at end of file
+    shares = relationship("ProjectShare", back_populates="project", cascade="all, delete-orphan")
+
+    @property
+    def progress(self):
+        """Phần trăm task đã hoàn thành, tính từ bộ đếm."""
+        if not self.task_count:
+            return 0
+        return int((self.completed_count or 0) / self.task_count * 100)
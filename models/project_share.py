@@ -1,14 +1,18 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
 class ProjectShare(Base):
     __tablename__ = "project_shares"
+    __table_args__ = (
+        Index("ix_project_shares_project_user", "project_id", "user_id"),
+        Index("ix_project_shares_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    role = Column(Enum('viewer', 'editor', name='role_enum'), default='viewer')
+    role = Column(Enum('viewer', 'editor', name='role_enum', native_enum=False, create_constraint=True), default='viewer')
 
     project = relationship("Project", back_populates="shares")
     user = relationship("User")
\ No newline at end of file
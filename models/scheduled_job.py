@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+from database import Base
+
+class ScheduledJob(Base):
+    """Trạng thái của một job định kỳ, dùng chung giữa các worker (khoá leader qua locked_until)."""
+    __tablename__ = "scheduled_jobs"
+
+    name = Column(String(100), primary_key=True)
+    next_run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_run_at = Column(DateTime, nullable=True)
+    last_success_at = Column(DateTime, nullable=True)
+    failures = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
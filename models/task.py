@@ -1,22 +1,37 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Table
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Table, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
 
 task_tags = Table('task_tags', Base.metadata,
     Column('task_id', Integer, ForeignKey('tasks.id')),
-    Column('tag_id', Integer, ForeignKey('tags.id'))
+    Column('tag_id', Integer, ForeignKey('tags.id')),
+    Index('uq_task_tags_task_tag', 'task_id', 'tag_id', unique=True),
+    Index('ix_task_tags_tag_id', 'tag_id'),
 )
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Kiểm tra trùng tiêu đề trong project
+        Index("ix_tasks_project_title", "project_id", "title"),
+        # Trang chi tiết project: task gốc / task con theo độ ưu tiên
+        Index("ix_tasks_project_parent_priority", "project_id", "parent_id", "priority"),
+        # Duyệt cây sub-task theo parent_id
+        Index("ix_tasks_parent_id", "parent_id"),
+        Index("ix_tasks_owner_id", "owner_id"),
+        # Phiên bản project cho ETag: MAX(updated_at) theo project
+        Index("ix_tasks_project_updated", "project_id", "updated_at"),
+        # Quét nhắc nhở hạn chót
+        Index("ix_tasks_reminder", "completed", "reminder_sent", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text)
     due_date = Column(DateTime, nullable=True)
     completed = Column(Boolean, default=False)
-    priority = Column(Enum('low', 'medium', 'high', name='priority_enum'), default='medium')
+    priority = Column(Enum('low', 'medium', 'high', name='priority_enum', native_enum=False, create_constraint=True), default='medium')
     parent_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
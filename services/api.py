@@ -0,0 +1,273 @@
+from datetime import datetime
+from sqlalchemy import select, and_, inspect
+from models.project import Project
+from models.project_share import ProjectShare
+from models.task import Task
+from services.permissions import get_project_role, has_role
+from services.task_ops import set_subtree_completed
+from services.tag_service import set_task_tags
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+MAX_BATCH_OPERATIONS = 500
+PRIORITIES = ("low", "medium", "high")
+
+class ApiError(Exception):
+    """Lỗi trả về cho client API dưới dạng JSON với mã HTTP tương ứng."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+# Các trường client có thể chọn qua ?fields=, mỗi trường là một hàm lấy giá trị
+TASK_FIELDS = {
+    "id": lambda task: task.id,
+    "project_id": lambda task: task.project_id,
+    "parent_id": lambda task: task.parent_id,
+    "owner_id": lambda task: task.owner_id,
+    "title": lambda task: task.title,
+    "description": lambda task: task.description,
+    "due_date": lambda task: task.due_date.strftime("%Y-%m-%d") if task.due_date else None,
+    "completed": lambda task: bool(task.completed),
+    "priority": lambda task: task.priority,
+    "tags": lambda task: [tag.name for tag in task.tags],
+    "created_at": lambda task: _isoformat(task.created_at),
+    "updated_at": lambda task: _isoformat(task.updated_at),
+}
+
+PROJECT_FIELDS = {
+    "id": lambda project, role: project.id,
+    "title": lambda project, role: project.title,
+    "description": lambda project, role: project.description,
+    "owner_id": lambda project, role: project.owner_id,
+    "role": lambda project, role: role,
+    "task_count": lambda project, role: project.task_count,
+    "completed_count": lambda project, role: project.completed_count,
+    "progress": lambda project, role: project.progress,
+    "created_at": lambda project, role: _isoformat(project.created_at),
+    "updated_at": lambda project, role: _isoformat(project.updated_at),
+}
+
+SHARE_FIELDS = ("id", "project_id", "user_id", "role")
+
+def parse_fields(value, allowed):
+    """Danh sách trường từ tham số `fields` (phân tách bằng dấu phẩy); mặc định là tất cả."""
+    if not value:
+        return list(allowed)
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_limit(value):
+    try:
+        limit = int(value) if value else API_PAGE_SIZE
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+def parse_cursor(value):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        raise ApiError("Invalid cursor")
+
+def serialize_task(task, fields):
+    return {name: TASK_FIELDS[name](task) for name in fields}
+
+def serialize_project(project, role, fields):
+    return {name: PROJECT_FIELDS[name](project, role) for name in fields}
+
+def page_of(rows, limit):
+    """Cắt kết quả đã lấy dư một dòng thành (trang, cursor kế tiếp)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0] if isinstance(rows[-1], tuple) else rows[-1]
+        return rows, str(last.id)
+    return rows, None
+
+def require_role(db, project_id, user_id, min_role):
+    """Cùng quy tắc với blueprint HTML; project không truy cập được coi như không tồn tại."""
+    role = get_project_role(db, project_id, user_id)
+    if not role:
+        raise ApiError("Project not found.", 404)
+    if not has_role(role, min_role):
+        raise ApiError("You don't have permission to perform this action.", 403)
+    return role
+
+def accessible_projects_query(db, user_id):
+    """Project user sở hữu hoặc được chia sẻ, kèm vai trò, theo thứ tự id."""
+    return (
+        db.query(Project, ProjectShare.role)
+        .outerjoin(ProjectShare, and_(ProjectShare.project_id == Project.id, ProjectShare.user_id == user_id))
+        .filter((Project.owner_id == user_id) | (ProjectShare.id.isnot(None)))
+        .order_by(Project.id)
+    )
+
+def get_task(db, task_id, user_id, min_role):
+    task = db.get(Task, task_id)
+    if task is None:
+        raise ApiError("Task not found.", 404)
+    require_role(db, task.project_id, user_id, min_role)
+    return task
+
+def _parse_due_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ApiError("due_date must use the YYYY-MM-DD format")
+
+def _parse_tags(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise ApiError("tags must be a list of names")
+    return [name.strip() for name in value if name.strip()]
+
+def _check_description(value):
+    if value is not None and not isinstance(value, str):
+        raise ApiError("description must be a string or null")
+    return value
+
+def _check_bool(data, name, default):
+    value = data.get(name, default)
+    if not isinstance(value, bool):
+        raise ApiError(f"{name} must be true or false")
+    return value
+
+def _check_title(db, project_id, title, task_id=None):
+    title = (title or "").strip() if isinstance(title, str) else ""
+    if not title:
+        raise ApiError("Task title is required.")
+    query = select(Task.id).where(Task.project_id == project_id, Task.title == title)
+    if task_id is not None:
+        query = query.where(Task.id != task_id)
+    if db.execute(query.limit(1)).first():
+        raise ApiError("Task title already exists in this project.", 409)
+    return title
+
+def _check_priority(value):
+    if value not in PRIORITIES:
+        raise ApiError(f"priority must be one of: {', '.join(PRIORITIES)}")
+    return value
+
+def _check_parent(db, project_id, parent_id):
+    if parent_id is None:
+        return None
+    parent = db.get(Task, parent_id) if isinstance(parent_id, int) else None
+    if parent is None or parent.project_id != project_id:
+        raise ApiError("Parent task not found in this project.")
+    return parent_id
+
+def create_task(db, project_id, user_id, data):
+    """Tạo task (hoặc sub-task nếu có parent_id); không commit."""
+    require_role(db, project_id, user_id, "editor")
+    task = Task(
+        title=_check_title(db, project_id, data.get("title")),
+        description=_check_description(data.get("description")),
+        due_date=_parse_due_date(data.get("due_date")),
+        priority=_check_priority(data.get("priority", "medium")),
+        completed=_check_bool(data, "completed", False),
+        project_id=project_id,
+        owner_id=user_id,
+        parent_id=_check_parent(db, project_id, data.get("parent_id")),
+    )
+    db.add(task)
+    set_task_tags(db, task, _parse_tags(data.get("tags", [])), replace=False)
+    return task
+
+def update_task(db, task_id, user_id, data):
+    """Cập nhật các trường có mặt trong data; không commit."""
+    task = get_task(db, task_id, user_id, "editor")
+    if "title" in data:
+        task.title = _check_title(db, task.project_id, data["title"], task.id)
+    if "description" in data:
+        task.description = _check_description(data["description"])
+    if "due_date" in data:
+        task.due_date = _parse_due_date(data["due_date"])
+    if "priority" in data:
+        task.priority = _check_priority(data["priority"])
+    if "tags" in data:
+        set_task_tags(db, task, _parse_tags(data["tags"]))
+    return task
+
+def toggle_task(db, task_id, user_id, data):
+    """Đổi trạng thái hoàn thành cho task và toàn bộ sub-task; `completed` chỉ định rõ trạng thái."""
+    task = get_task(db, task_id, user_id, "editor")
+    status = _check_bool(data, "completed", not task.completed)
+    set_subtree_completed(db, task, status)
+    return task
+
+def delete_task(db, task_id, user_id, data=None):
+    task = get_task(db, task_id, user_id, "editor")
+    db.delete(task)
+    db.flush()
+    return None
+
+def _operation_data(operation):
+    data = operation.get("data", {})
+    if not isinstance(data, dict):
+        raise ApiError("data must be a JSON object")
+    return data
+
+def _batch_create(db, user_id, operation):
+    project_id = operation.get("project_id")
+    if not isinstance(project_id, int):
+        raise ApiError("project_id is required")
+    return create_task(db, project_id, user_id, _operation_data(operation))
+
+def _batch_task_op(handler):
+    def run(db, user_id, operation):
+        task_id = operation.get("task_id")
+        if not isinstance(task_id, int):
+            raise ApiError("task_id is required")
+        return handler(db, task_id, user_id, _operation_data(operation))
+    return run
+
+BATCH_OPERATIONS = {
+    "create": _batch_create,
+    "update": _batch_task_op(update_task),
+    "toggle": _batch_task_op(toggle_task),
+    "delete": _batch_task_op(delete_task),
+}
+
+def run_batch(db, user_id, operations, fields):
+    """Áp dụng lần lượt các thao tác trong cùng một transaction.
+
+    Thao tác lỗi làm rollback toàn bộ lô; lỗi mang theo chỉ số của thao tác đó.
+    Vai trò trên mỗi project được ghi nhớ trong request nên chỉ được truy vấn một lần.
+    Task bị xoá bởi một thao tác sau trong lô (kể cả qua task cha) trả về null.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise ApiError("operations must be a non-empty list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ApiError(f"A batch may contain at most {MAX_BATCH_OPERATIONS} operations")
+
+    tasks = []
+    for index, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict) or operation.get("op") not in BATCH_OPERATIONS:
+                raise ApiError(f"op must be one of: {', '.join(BATCH_OPERATIONS)}")
+            tasks.append(BATCH_OPERATIONS[operation["op"]](db, user_id, operation))
+        except ApiError as e:
+            db.rollback()
+            e.message = f"operations[{index}]: {e.message}"
+            raise
+    db.flush()
+    results = []
+    for task in tasks:
+        state = inspect(task) if task is not None else None
+        if state is None or state.deleted or state.detached:
+            results.append(None)
+            continue
+        db.refresh(task)
+        results.append(serialize_task(task, fields))
+    db.commit()
+    return results
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import re
+from io import BytesIO
+from utils import UPLOAD_FOLDER
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # không có Pillow thì lưu nguyên file gốc
+    Image = ImageOps = None
+
+# Cạnh (px) của từng biến thể; ảnh được cắt vuông ở giữa
+AVATAR_SIZES = {"sm": 96, "lg": 256}
+AVATAR_FORMAT = "WEBP"
+AVATAR_QUALITY = 80
+MAX_AVATAR_BYTES = 10 * 1024 * 1024
+
+# avatar_<user>_<hash>_<size>.webp hoặc avatar_<user>_<hash>.<ext> khi không có Pillow
+_AVATAR_NAME = re.compile(r"^(avatar_\d+_[0-9a-f]+)(?:_(\w+))?\.\w+$")
+
+class InvalidAvatar(ValueError):
+    pass
+
+def avatar_key(filename):
+    """Phần tên chung của mọi biến thể một avatar; None nếu không phải file do pipeline tạo."""
+    match = _AVATAR_NAME.match(filename)
+    return match.group(1) if match else None
+
+def _encode(image, size):
+    variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    variant.save(buffer, AVATAR_FORMAT, quality=AVATAR_QUALITY, method=6)
+    return buffer.getvalue()
+
+def _render_variants(data):
+    try:
+        image = Image.open(BytesIO(data))
+        # JPEG được giải mã sẵn ở độ phân giải thấp, nhanh hơn nhiều với ảnh chụp nhiều MB
+        image.draft("RGB", (max(AVATAR_SIZES.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidAvatar("Uploaded file is not a valid image.") from e
+    return {name: _encode(image, size) for name, size in AVATAR_SIZES.items()}
+
+def save_avatar(file, user_id):
+    """Giải mã, thu nhỏ và ghi các biến thể avatar; trả về tên file biến thể lớn nhất.
+
+    Tên file chứa hash nội dung nên có thể cache vĩnh viễn phía trình duyệt.
+    """
+    data = file.read(MAX_AVATAR_BYTES + 1)
+    if len(data) > MAX_AVATAR_BYTES:
+        raise InvalidAvatar("Avatar is too large.")
+
+    if Image is None:
+        ext = file.filename.rsplit('.', 1)[1].lower()
+        filename = f"avatar_{user_id}_{hashlib.sha256(data).hexdigest()[:16]}.{ext}"
+        _write(filename, data)
+        return filename
+
+    variants = _render_variants(data)
+    digest = hashlib.sha256(variants["lg"]).hexdigest()[:16]
+    for name, encoded in variants.items():
+        _write(f"avatar_{user_id}_{digest}_{name}.webp", encoded)
+    return f"avatar_{user_id}_{digest}_lg.webp"
+
+def _write(filename, data):
+    path = os.path.join(UPLOAD_FOLDER, filename)
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def avatar_variant(avatar_url, size="sm"):
+    """URL biến thể `size` của avatar; avatar cũ (trước pipeline) giữ nguyên URL."""
+    if not avatar_url:
+        return avatar_url
+    head, filename = avatar_url.rsplit("/", 1)
+    match = _AVATAR_NAME.match(filename)
+    if not match or not match.group(2) or size not in AVATAR_SIZES:
+        return avatar_url
+    return f"{head}/{match.group(1)}_{size}.webp"
+
+def delete_avatar(avatar_url):
+    """Xoá mọi biến thể của một avatar đã bị thay thế."""
+    if not avatar_url:
+        return
+    filename = os.path.basename(avatar_url)
+    key = avatar_key(filename)
+    names = [filename] if key is None else [
+        entry.name for entry in os.scandir(UPLOAD_FOLDER) if avatar_key(entry.name) == key
+    ]
+    for name in names:
+        try:
+            os.remove(os.path.join(UPLOAD_FOLDER, name))
+        except FileNotFoundError:
+            pass
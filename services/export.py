@@ -0,0 +1,196 @@
+import csv
+import json
+from io import StringIO
+from sqlalchemy import select, func
+from database import SessionLocal
+from models.project import Project
+from models.tag import Tag
+from models.task import Task, task_tags
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # định dạng cột là tuỳ chọn
+    pa = pq = None
+
+EXPORT_CHUNK_SIZE = 1000
+STREAM_BUFFER_SIZE = 64 * 1024
+
+CSV_HEADER = [
+    "Task ID", "Title", "Description", "Due Date", "Completed", "Priority", "Parent ID", "Tags",
+    "Owner ID", "Created At", "Updated At",
+]
+
+def _tags_column():
+    """Danh sách tag của task được gộp sẵn trong SQL, tránh N+1 qua task.tags."""
+    return (
+        select(func.aggregate_strings(Tag.name, ","))
+        .select_from(task_tags)
+        .join(Tag, Tag.id == task_tags.c.tag_id)
+        .where(task_tags.c.task_id == Task.id)
+        .scalar_subquery()
+        .label("tags")
+    )
+
+def iter_task_chunks(db, project_ids):
+    """Duyệt task của các project theo từng khối, không hydrate đối tượng ORM."""
+    stmt = (
+        select(
+            Task.id, Task.project_id, Project.title.label("project_title"),
+            Task.title, Task.description, Task.due_date, Task.completed, Task.priority,
+            Task.parent_id, Task.owner_id, Task.created_at, Task.updated_at,
+            _tags_column(),
+        )
+        .join(Project, Project.id == Task.project_id)
+        .where(Task.project_id.in_(project_ids))
+        .order_by(Task.project_id, Task.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    yield from db.execute(stmt).partitions()
+
+def _tag_list(row):
+    return row.tags.split(",") if row.tags else []
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def write_csv(chunks, include_project=False):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow((["Project"] if include_project else []) + CSV_HEADER)
+    for chunk in chunks:
+        for row in chunk:
+            writer.writerow(([row.project_title] if include_project else []) + [
+                row.id, row.title, row.description,
+                row.due_date.strftime('%Y-%m-%d') if row.due_date else "",
+                row.completed, row.priority, row.parent_id or "", row.tags or "",
+                row.owner_id, _isoformat(row.created_at) or "", _isoformat(row.updated_at) or "",
+            ])
+        if buffer.tell() >= STREAM_BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def write_jsonl(chunks, include_project=False):
+    """Mỗi dòng một object JSON với kiểu dữ liệu đầy đủ (bool, ISO datetime, tags là list)."""
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            record = {
+                "id": row.id,
+                "project_id": row.project_id,
+                "title": row.title,
+                "description": row.description,
+                "due_date": _isoformat(row.due_date),
+                "completed": bool(row.completed),
+                "priority": row.priority,
+                "parent_id": row.parent_id,
+                "owner_id": row.owner_id,
+                "created_at": _isoformat(row.created_at),
+                "updated_at": _isoformat(row.updated_at),
+                "tags": _tag_list(row),
+            }
+            if include_project:
+                record["project"] = row.project_title
+            lines.append(json.dumps(record, ensure_ascii=False))
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+class _ChunkSink:
+    """File-like chỉ ghi, gom các byte Parquet đã ghi để trả về theo từng khối."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _parquet_schema(include_project):
+    fields = [
+        ("id", pa.int64()), ("project_id", pa.int64()),
+        ("title", pa.string()), ("description", pa.string()),
+        ("due_date", pa.timestamp("us")), ("completed", pa.bool_()), ("priority", pa.string()),
+        ("parent_id", pa.int64()), ("owner_id", pa.int64()),
+        ("created_at", pa.timestamp("us")), ("updated_at", pa.timestamp("us")),
+        ("tags", pa.list_(pa.string())),
+    ]
+    if include_project:
+        fields.append(("project", pa.string()))
+    return pa.schema(fields)
+
+def write_parquet(chunks, include_project=False):
+    """Mỗi khối task thành một row group Parquet."""
+    schema = _parquet_schema(include_project)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    try:
+        for chunk in chunks:
+            columns = {
+                "id": [row.id for row in chunk],
+                "project_id": [row.project_id for row in chunk],
+                "title": [row.title for row in chunk],
+                "description": [row.description for row in chunk],
+                "due_date": [row.due_date for row in chunk],
+                "completed": [bool(row.completed) for row in chunk],
+                "priority": [row.priority for row in chunk],
+                "parent_id": [row.parent_id for row in chunk],
+                "owner_id": [row.owner_id for row in chunk],
+                "created_at": [row.created_at for row in chunk],
+                "updated_at": [row.updated_at for row in chunk],
+                "tags": [_tag_list(row) for row in chunk],
+            }
+            if include_project:
+                columns["project"] = [row.project_title for row in chunk]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+class ExportFormat:
+    def __init__(self, writer, mimetype, extension):
+        self.writer = writer
+        self.mimetype = mimetype
+        self.extension = extension
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat(write_csv, "text/csv", "csv"),
+    "jsonl": ExportFormat(write_jsonl, "application/x-ndjson", "jsonl"),
+}
+if pq is not None:
+    EXPORT_FORMATS["parquet"] = ExportFormat(write_parquet, "application/vnd.apache.parquet", "parquet")
+
+def stream_tasks(export_format, project_ids, include_project=False):
+    """Sinh nội dung export theo định dạng đã chọn.
+
+    Generator chạy sau khi view đã trả về nên dùng session riêng, đóng khi kết thúc.
+    """
+    db = SessionLocal()
+    try:
+        yield from export_format.writer(iter_task_chunks(db, project_ids), include_project)
+    finally:
+        db.close()
@@ -0,0 +1,102 @@
+import hashlib
+import time
+from datetime import date
+from flask import request, session, make_response, render_template
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
+from sqlalchemy import select, func
+from models.project import Project
+from models.task import Task
+from utils import TTLCache
+from config import FRAGMENT_CACHE_ENABLED
+
+# Đổi sau mỗi lần khởi động, để template mới không bị che bởi ETag cũ
+BOOT_ID = f"{time.time_ns():x}"
+
+FRAGMENT_CACHE_TTL = 3600
+
+fragment_cache = TTLCache(ttl=FRAGMENT_CACHE_TTL, maxsize=5000)
+
+class PageValidators:
+    """ETag yếu và Last-Modified của một trang HTML, cho conditional GET."""
+
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def not_modified(self):
+        return not is_resource_modified(request.environ, etag=self.etag, last_modified=self.last_modified)
+
+    def apply(self, response):
+        response = make_response(response)
+        response.set_etag(self.etag, weak=True)
+        if self.last_modified:
+            response.last_modified = self.last_modified
+        # Trình duyệt luôn hỏi lại server, nhưng có thể nhận 304 thay vì cả trang
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add("Cookie")
+        return response
+
+    def not_modified_response(self):
+        return self.apply(make_response("", 304))
+
+def page_validators(*version, last_modified=None, shows_flashes=False):
+    """Tạo validators từ phiên bản dữ liệu, user hiện tại, tham số lọc và ngày hôm nay.
+
+    Trang có hiển thị flash message thì không trả 304 khi còn flash chờ hiển thị (trả về None).
+    """
+    if shows_flashes and session.get("_flashes"):
+        return None
+    viewer = (
+        session.get("user_id"), session.get("username"), session.get("is_admin"),
+        session.get("theme"), session.get("avatar_url"),
+    )
+    raw = repr((
+        BOOT_ID, request.endpoint, date.today().isoformat(), viewer,
+        sorted(request.args.items(multi=True)), version,
+    ))
+    return PageValidators(hashlib.sha1(raw.encode()).hexdigest(), last_modified)
+
+def conditional(validators, render):
+    """Trả 304 nếu client đã có bản hiện tại, nếu không gọi render() và gắn validators."""
+    if validators is None:
+        return render()
+    if validators.not_modified():
+        return validators.not_modified_response()
+    return validators.apply(render())
+
+def project_version(db, project_id):
+    """Phiên bản project: updated_at, bộ đếm và updated_at mới nhất của task (index project_id, updated_at)."""
+    row = db.execute(
+        select(
+            Project.updated_at, Project.task_count, Project.completed_count,
+            select(func.max(Task.updated_at)).where(Task.project_id == project_id).scalar_subquery(),
+        )
+        .where(Project.id == project_id)
+    ).first()
+    if row is None:
+        return None, None
+    timestamps = [value for value in (row[0], row[3]) if value]
+    return tuple(row), max(timestamps) if timestamps else None
+
+def dashboard_version(db, user_id):
+    """Phiên bản dashboard: id, updated_at và bộ đếm của mọi project user sở hữu."""
+    rows = db.execute(
+        select(Project.id, Project.updated_at, Project.task_count, Project.completed_count)
+        .where(Project.owner_id == user_id)
+        .order_by(Project.id)
+    ).all()
+    timestamps = [row.updated_at for row in rows if row.updated_at]
+    return tuple(tuple(row) for row in rows), max(timestamps) if timestamps else None
+
+def project_card(project):
+    """Render partials/_project_card.html, cache HTML theo phiên bản của project."""
+    if not FRAGMENT_CACHE_ENABLED:
+        return Markup(render_template("partials/_project_card.html", project=project))
+    key = (project.id, project.updated_at, project.task_count, project.completed_count)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(render_template("partials/_project_card.html", project=project))
+        fragment_cache.set(key, html)
+    return html
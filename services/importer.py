@@ -0,0 +1,184 @@
+import csv
+import json
+from datetime import datetime
+from sqlalchemy import select, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from models.task import Task
+from models.counters import adjust_project_counters
+from services.user_stats import invalidate_user_stats
+from services.tag_service import set_tags_for_tasks
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+PRIORITIES = {"low", "medium", "high"}
+
+# Tên cột CSV (giống export_project) -> khoá nội bộ
+CSV_COLUMNS = {
+    "Task ID": "id",
+    "Title": "title",
+    "Description": "description",
+    "Due Date": "due_date",
+    "Completed": "completed",
+    "Priority": "priority",
+    "Parent ID": "parent_id",
+    "Tags": "tags",
+}
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("true", "1", "yes")
+
+def _parse_datetime(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    value = str(value).strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d")
+
+def _parse_tags(value):
+    if isinstance(value, list):
+        return [str(tag).strip() for tag in value if str(tag).strip()]
+    return [tag.strip() for tag in str(value or "").split(",") if tag.strip()]
+
+def _optional_int(value):
+    return int(value) if value not in (None, "") else None
+
+def _creates_cycle(parents, task_id, parent_id):
+    """Cây sub-task được duyệt bằng CTE đệ quy nên không được phép có chu trình."""
+    seen = set()
+    while parent_id is not None and parent_id not in seen:
+        if parent_id == task_id:
+            return True
+        seen.add(parent_id)
+        parent_id = parents.get(parent_id)
+    return False
+
+def iter_records(stream, file_format):
+    """Đọc file CSV (cùng schema với export) hoặc JSONL, trả về (số dòng, dict)."""
+    if file_format == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError as e:
+                    yield line_no, e
+        return
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, {CSV_COLUMNS.get(key, key): value for key, value in record.items()}
+
+def import_tasks(db, project_id, owner_id, stream, file_format="csv", chunk_size=IMPORT_CHUNK_SIZE):
+    """Nhập task hàng loạt vào project: INSERT theo lô, commit theo từng lô.
+
+    Lỗi ở từng dòng, kể cả lỗi từ DB khi chèn, được ghi vào báo cáo mà không
+    dừng cả quá trình. Quan hệ cha-con theo id trong file được nối lại sau khi
+    mọi dòng đã được chèn.
+    """
+    report = ImportReport()
+    titles = set(db.scalars(select(Task.title).where(Task.project_id == project_id)))
+    id_map = {}
+    pending_parents = []
+    chunk = []
+
+    def insert_entries(entries):
+        """Chèn các dòng trong một SAVEPOINT; lỗi DB chỉ hoàn tác chính các dòng này."""
+        rows = [entry["values"] for entry in entries]
+        with db.begin_nested():
+            new_ids = db.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows).all()
+            tags_by_task = {new_id: entry["tags"] for entry, new_id in zip(entries, new_ids) if entry["tags"]}
+            if tags_by_task:
+                set_tags_for_tasks(db, tags_by_task, replace=False)
+            completed = sum(1 for values in rows if values["completed"])
+            adjust_project_counters(db.connection(), project_id, len(rows), completed)
+        for entry, new_id in zip(entries, new_ids):
+            if entry["source_id"] is not None:
+                id_map[entry["source_id"]] = new_id
+            if entry["parent_source_id"] is not None:
+                pending_parents.append((entry["line"], new_id, entry["parent_source_id"]))
+        report.imported += len(rows)
+
+    def flush_chunk():
+        if not chunk:
+            return
+        try:
+            insert_entries(chunk)
+        except SQLAlchemyError:
+            # Thử lại từng dòng để chỉ bỏ qua những dòng thực sự lỗi
+            for entry in chunk:
+                try:
+                    insert_entries([entry])
+                except SQLAlchemyError as e:
+                    titles.discard(entry["values"]["title"])
+                    report.add_error(entry["line"], f"database error: {getattr(e, 'orig', None) or e}")
+        db.commit()
+        invalidate_user_stats(owner_id)
+        chunk.clear()
+
+    for line_no, record in iter_records(stream, file_format):
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f"invalid JSON: {record}")
+            title = (record.get("title") or "").strip()
+            if not title:
+                raise ValueError("title is required")
+            if title in titles:
+                raise ValueError(f"task title '{title}' already exists in this project")
+            priority = record.get("priority") or "medium"
+            if priority not in PRIORITIES:
+                raise ValueError(f"invalid priority '{priority}'")
+            entry = {
+                "line": line_no,
+                "source_id": _optional_int(record.get("id")),
+                "parent_source_id": _optional_int(record.get("parent_id")),
+                "tags": _parse_tags(record.get("tags")),
+                "values": {
+                    "title": title,
+                    "description": record.get("description") or None,
+                    "due_date": _parse_datetime(record.get("due_date")),
+                    "completed": _parse_bool(record.get("completed")),
+                    "priority": priority,
+                    "project_id": project_id,
+                    "owner_id": owner_id,
+                },
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            report.add_error(line_no, str(e))
+            continue
+
+        titles.add(title)
+        chunk.append(entry)
+        if len(chunk) >= chunk_size:
+            flush_chunk()
+    flush_chunk()
+
+    # Nối task cha-con bằng UPDATE hàng loạt theo khoá chính
+    parents = {}
+    for line_no, task_id, parent_source_id in pending_parents:
+        parent_id = id_map.get(parent_source_id)
+        if parent_id is None:
+            report.add_error(line_no, f"parent task {parent_source_id} not found in file; imported as a top-level task")
+        elif _creates_cycle(parents, task_id, parent_id):
+            report.add_error(line_no, f"parent task {parent_source_id} would create a cycle; imported as a top-level task")
+        else:
+            parents[task_id] = parent_id
+    links = [{"id": task_id, "parent_id": parent_id} for task_id, parent_id in parents.items()]
+    for start in range(0, len(links), chunk_size):
+        db.execute(update(Task), links[start:start + chunk_size])
+        db.commit()
+    return report
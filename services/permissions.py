@@ -0,0 +1,105 @@
+from functools import wraps
+from flask import g, has_app_context, session, redirect, url_for, flash
+from sqlalchemy import select, and_, event
+from database import get_db
+from models.project import Project
+from models.project_share import ProjectShare
+from utils import TTLCache
+
+ROLE_RANK = {"viewer": 1, "editor": 2, "owner": 3}
+ROLE_CACHE_TTL = 60
+
+# (project_id, user_id) -> role; chỉ cache khi có quyền
+role_cache = TTLCache(ttl=ROLE_CACHE_TTL, maxsize=10000)
+
+def accessible_project_ids(user_id):
+    """SELECT id của các project user sở hữu hoặc được chia sẻ."""
+    return select(Project.id).where(Project.owner_id == user_id).union(
+        select(ProjectShare.project_id).where(ProjectShare.user_id == user_id)
+    )
+
+def get_project_role(db, project_id, user_id):
+    """Vai trò của user trên project: 'owner', 'editor', 'viewer' hoặc None.
+
+    Một truy vấn JOIN duy nhất, ghi nhớ trong request (flask.g) và cache TTL giữa các request.
+    Kết quả "không có quyền" không được cache: id project có thể được SQLite cấp lại
+    cho project mới. Cache nằm trong từng process, invalidation qua ORM event chỉ xoá
+    cache của worker đang xử lý; worker khác có thể vẫn thấy vai trò cũ (ví dụ quyền
+    chia sẻ vừa bị thu hồi) tối đa ROLE_CACHE_TTL giây.
+    """
+    key = (project_id, user_id)
+    memo = g.setdefault("_project_roles", {}) if has_app_context() else {}
+    if key in memo:
+        return memo[key]
+
+    role = role_cache.get(key)
+    if role is None:
+        row = db.execute(
+            select(Project.owner_id, ProjectShare.role)
+            .outerjoin(ProjectShare, and_(ProjectShare.project_id == Project.id, ProjectShare.user_id == user_id))
+            .where(Project.id == project_id)
+        ).first()
+        if row is None:
+            role = None
+        elif row.owner_id == user_id:
+            role = "owner"
+        else:
+            role = row.role
+        if role:
+            role_cache.set(key, role)
+
+    memo[key] = role or None
+    return memo[key]
+
+def has_role(role, min_role):
+    return ROLE_RANK.get(role, 0) >= ROLE_RANK[min_role]
+
+def can_edit_project(db, project_id, user_id):
+    return has_role(get_project_role(db, project_id, user_id), "editor")
+
+def invalidate_project_roles(project_id=None, user_id=None):
+    """Xoá cache vai trò theo project và/hoặc user."""
+    role_cache.invalidate_where(
+        lambda key: (project_id is None or key[0] == project_id) and (user_id is None or key[1] == user_id)
+    )
+    if has_app_context():
+        g.pop("_project_roles", None)
+
+@event.listens_for(ProjectShare, "after_insert")
+@event.listens_for(ProjectShare, "after_update")
+@event.listens_for(ProjectShare, "after_delete")
+def _share_changed(mapper, connection, target):
+    invalidate_project_roles(target.project_id, target.user_id)
+
+@event.listens_for(Project, "after_insert")
+@event.listens_for(Project, "after_update")
+@event.listens_for(Project, "after_delete")
+def _project_changed(mapper, connection, target):
+    invalidate_project_roles(target.id)
+
+def require_project_role(min_role, message="You don't have access to this project.", missing_message=None):
+    """Decorator cho các route có tham số project_id: kiểm tra quyền và gán g.project_role.
+
+    User có quyền xem nhưng thiếu quyền yêu cầu được đưa về trang project,
+    user không có quyền gì được đưa về dashboard. Nếu có missing_message, nó được
+    hiển thị thay cho message khi project không tồn tại.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if "user_id" not in session:
+                return redirect(url_for("auth.login"))
+            project_id = kwargs["project_id"]
+            role = get_project_role(get_db(), project_id, session["user_id"])
+            if not has_role(role, min_role):
+                if not role and missing_message and get_db().get(Project, project_id) is None:
+                    flash(missing_message, "error")
+                else:
+                    flash(message, "error")
+                if role:
+                    return redirect(url_for("project.view_project", project_id=project_id))
+                return redirect(url_for("project.dashboard"))
+            g.project_role = role
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask_mail import Message
+from sqlalchemy import select, update
+from database import SessionLocal
+from models.project import Project
+from models.task import Task
+from models.user import User
+from config import REMINDER_SMTP_CONCURRENCY
+
+REMINDER_LOOKAHEAD = timedelta(days=1)
+MARK_BATCH_SIZE = 500
+
+_dispatch_lock = threading.Lock()
+
+def collect_due_reminders(db, now=None):
+    """Một truy vấn JOIN lấy mọi task sắp đến hạn, gom thành digest theo user."""
+    now = now or datetime.now()
+    rows = db.execute(
+        select(
+            Task.id, Task.title, Task.due_date, Project.title.label("project_title"),
+            User.id.label("user_id"), User.username, User.email,
+        )
+        .join(User, User.id == Task.owner_id)
+        .join(Project, Project.id == Task.project_id)
+        .where(
+            Task.due_date <= now + REMINDER_LOOKAHEAD,
+            Task.completed == False,
+            Task.reminder_sent == False,
+            User.email.isnot(None),
+            User.email != "",
+        )
+        .order_by(User.id, Task.due_date)
+    ).all()
+
+    digests = {}
+    for row in rows:
+        digest = digests.setdefault(row.user_id, {"email": row.email, "username": row.username, "tasks": []})
+        digest["tasks"].append(row)
+    return list(digests.values())
+
+def build_digest_message(digest):
+    tasks = digest["tasks"]
+    lines = [f"Hi {digest['username']},", "", "The following tasks are due soon:", ""]
+    for task in tasks:
+        lines.append(f"- '{task.title}' in project '{task.project_title}' is due on {task.due_date.strftime('%Y-%m-%d')}")
+    lines += ["", "Please complete them soon!"]
+    subject = (
+        f"Reminder: Task '{tasks[0].title}' is due soon" if len(tasks) == 1
+        else f"Reminder: {len(tasks)} tasks are due soon"
+    )
+    return Message(subject=subject, recipients=[digest["email"]], body="\n".join(lines))
+
+def _send_batch(app, digests):
+    """Gửi một nhóm digest trên một kết nối SMTP dùng lại suốt nhóm."""
+    sent_task_ids = []
+    if not digests:
+        return sent_task_ids
+    with app.app_context():
+        mail = app.extensions["mail"]
+        with mail.connect() as connection:
+            for digest in digests:
+                try:
+                    connection.send(build_digest_message(digest))
+                except Exception as e:
+                    app.logger.warning("Failed to send reminder to %s: %s", digest["email"], e)
+                    continue
+                sent_task_ids.extend(task.id for task in digest["tasks"])
+    return sent_task_ids
+
+def send_digests(app, digests, concurrency=REMINDER_SMTP_CONCURRENCY):
+    """Chia digest cho tối đa `concurrency` kết nối SMTP song song."""
+    concurrency = max(1, min(concurrency, len(digests)))
+    batches = [digests[i::concurrency] for i in range(concurrency)]
+    sent_task_ids = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for task_ids in pool.map(lambda batch: _send_batch(app, batch), batches):
+            sent_task_ids.extend(task_ids)
+    return sent_task_ids
+
+def mark_reminders_sent(db, task_ids):
+    for start in range(0, len(task_ids), MARK_BATCH_SIZE):
+        db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids[start:start + MARK_BATCH_SIZE]))
+            .values(reminder_sent=True, updated_at=Task.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+def dispatch_reminders(app, now=None):
+    """Quét, gửi và đánh dấu nhắc nhở. Bỏ qua nếu một lượt khác đang chạy trong process."""
+    if not _dispatch_lock.acquire(blocking=False):
+        return None
+    db = SessionLocal()
+    try:
+        digests = collect_due_reminders(db, now)
+        db.rollback()  # không giữ transaction đọc trong lúc gửi mail
+        if not digests:
+            return 0
+        sent_task_ids = send_digests(app, digests)
+        mark_reminders_sent(db, sent_task_ids)
+        return len(sent_task_ids)
+    finally:
+        db.close()
+        _dispatch_lock.release()
+
@@ -0,0 +1,173 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_, text
+from sqlalchemy.exc import IntegrityError
+from database import SessionLocal, engine
+from models.scheduled_job import ScheduledJob
+from models.user import User
+from models.counters import repair_project_counters
+from services.reminders import dispatch_reminders
+from services.avatars import avatar_key
+from utils import UPLOAD_FOLDER
+from config import REMINDER_INTERVAL, SCHEDULER_TICK
+
+# Định danh worker hiện tại, ghi vào scheduled_jobs.locked_by
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+RETRY_BASE = timedelta(seconds=30)
+AVATAR_GRACE_PERIOD = timedelta(hours=1)
+
+class Job:
+    def __init__(self, name, func, interval, lease=timedelta(minutes=10)):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.lease = lease
+
+def run_reminders(app):
+    dispatch_reminders(app)
+
+def run_counter_repair(app):
+    db = SessionLocal()
+    try:
+        repair_project_counters(db)
+    finally:
+        db.close()
+
+def _file_key(filename):
+    return avatar_key(filename) or filename
+
+def run_avatar_cleanup(app):
+    """Xoá file avatar không còn user nào tham chiếu."""
+    db = SessionLocal()
+    try:
+        # So theo key để giữ lại mọi biến thể kích thước của avatar đang dùng
+        referenced = {
+            _file_key(os.path.basename(url))
+            for url in db.scalars(select(User.avatar_url).where(User.avatar_url.isnot(None)))
+        }
+    finally:
+        db.close()
+    cutoff = time.time() - AVATAR_GRACE_PERIOD.total_seconds()
+    for entry in os.scandir(UPLOAD_FOLDER):
+        # Bỏ qua file vừa tải lên, có thể transaction lưu avatar_url chưa commit
+        if entry.is_file() and _file_key(entry.name) not in referenced and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+
+def run_vacuum_analyze(app):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if engine.dialect.name == "sqlite":
+            connection.execute(text("VACUUM"))
+            connection.execute(text("ANALYZE"))
+        else:
+            connection.execute(text("VACUUM ANALYZE"))
+
+JOBS = [
+    Job("reminders", run_reminders, timedelta(seconds=REMINDER_INTERVAL)),
+    Job("repair-counters", run_counter_repair, timedelta(days=1)),
+    Job("avatar-cleanup", run_avatar_cleanup, timedelta(days=1)),
+    Job("vacuum-analyze", run_vacuum_analyze, timedelta(days=7), lease=timedelta(hours=1)),
+]
+
+def _ensure_job_rows(db):
+    existing = set(db.scalars(select(ScheduledJob.name)))
+    for job in JOBS:
+        if job.name not in existing:
+            db.add(ScheduledJob(name=job.name, next_run_at=datetime.utcnow()))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Worker khác vừa tạo cùng job
+                db.rollback()
+
+def _try_acquire(db, job, now):
+    """Chỉ một worker giành được khoá: UPDATE có điều kiện, thắng khi rowcount == 1."""
+    result = db.execute(
+        update(ScheduledJob)
+        .where(
+            ScheduledJob.name == job.name,
+            ScheduledJob.next_run_at <= now,
+            or_(ScheduledJob.locked_until.is_(None), ScheduledJob.locked_until < now),
+        )
+        .values(locked_by=WORKER_ID, locked_until=now + job.lease)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def _finish(db, job, error=None):
+    now = datetime.utcnow()
+    state = db.get(ScheduledJob, job.name, populate_existing=True)
+    state.last_run_at = now
+    state.locked_by = None
+    state.locked_until = None
+    if error is None:
+        state.failures = 0
+        state.last_error = None
+        state.last_success_at = now
+        state.next_run_at = now + job.interval
+    else:
+        # Thử lại với backoff luỹ thừa, không chờ lâu hơn chu kỳ bình thường
+        state.failures = (state.failures or 0) + 1
+        state.last_error = str(error)[:2000]
+        state.next_run_at = now + min(RETRY_BASE * (2 ** (state.failures - 1)), job.interval)
+    db.commit()
+
+def request_run(db, name):
+    """Đưa job lên hạn ngay; worker giành được khoá ở lượt tick kế tiếp sẽ chạy nó."""
+    _ensure_job_rows(db)
+    result = db.execute(
+        update(ScheduledJob)
+        .where(ScheduledJob.name == name)
+        .values(next_run_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def run_pending(app):
+    """Chạy các job đến hạn mà worker này giành được khoá."""
+    db = SessionLocal()
+    try:
+        _ensure_job_rows(db)
+        for job in JOBS:
+            if not _try_acquire(db, job, datetime.utcnow()):
+                continue
+            try:
+                job.func(app)
+            except Exception as e:
+                app.logger.error("Scheduled job %s failed: %s", job.name, e)
+                _finish(db, job, e)
+            else:
+                _finish(db, job)
+    finally:
+        db.close()
+
+def start_scheduler(app, tick=SCHEDULER_TICK):
+    """Chạy bộ lập lịch trong thread nền của process, tách khỏi luồng xử lý request."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(tick):
+            try:
+                run_pending(app)
+            except Exception as e:
+                app.logger.error("Scheduler tick failed: %s", e)
+
+    threading.Thread(target=loop, name="scheduler", daemon=True).start()
+    return stop
+
+if __name__ == "__main__":
+    # Chạy độc lập: không để app khởi động thêm scheduler trong nền
+    import config
+    config.SCHEDULER_ENABLED = False
+    from app import app as flask_app
+
+    print(f"Scheduler {WORKER_ID} started.")
+    while True:
+        run_pending(flask_app)
+        time.sleep(SCHEDULER_TICK)
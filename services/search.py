@@ -0,0 +1,184 @@
+from sqlalchemy import select, table, column, literal, literal_column, or_, and_, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import selectinload
+from models.task import Task, task_tags
+from models.tag import Tag
+from models.project import Project
+from services.permissions import accessible_project_ids
+
+# Bảng FTS5 dạng external content: nội dung nằm ở tasks/projects, FTS chỉ giữ chỉ mục
+SEARCH_TABLES = {
+    "tasks_fts": "tasks",
+    "projects_fts": "projects",
+}
+
+_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {src} BEGIN
+  INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {src} BEGIN
+  INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title, description ON {src} BEGIN
+  INSERT INTO {fts}({fts}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+  INSERT INTO {fts}(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+"""
+
+_fts_enabled = False
+
+def ensure_search_index(engine):
+    """Tạo bảng FTS5 và trigger đồng bộ nếu backend hỗ trợ; nếu không thì dùng LIKE."""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+    try:
+        with engine.begin() as connection:
+            for fts, src in SEARCH_TABLES.items():
+                exists = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+                ).first()
+                if not exists:
+                    print(f"Creating full-text index {fts}...")
+                    connection.execute(text(
+                        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+                        f"title, description, content='{src}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+                    ))
+                    connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+                for statement in _TRIGGERS.format(fts=fts, src=src).split("END;"):
+                    if statement.strip():
+                        connection.execute(text(statement + "END;"))
+    except OperationalError as e:
+        print(f"Full-text search unavailable, falling back to LIKE: {e}")
+        _fts_enabled = False
+        return False
+    _fts_enabled = True
+    return True
+
+def _fts_query(search_query):
+    """Chuyển chuỗi người dùng nhập thành truy vấn FTS5 an toàn: mỗi từ là một tiền tố."""
+    tokens = [token.replace('"', '""') for token in search_query.split()]
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _matches(fts_name, model, search_query):
+    if _fts_enabled and search_query.strip():
+        fts = table(fts_name, column("rowid"), column("rank"))
+        return (
+            select(fts.c.rowid.label("id"), fts.c.rank.label("rank"))
+            .where(literal_column(fts_name).op("MATCH")(_fts_query(search_query)))
+            .subquery()
+        )
+    pattern = f"%{search_query}%"
+    return (
+        select(model.id.label("id"), literal(0).label("rank"))
+        .where(or_(model.title.like(pattern), model.description.like(pattern)))
+        .subquery()
+    )
+
+def match_tasks(search_query):
+    """Subquery (id, rank) các task khớp; rank càng nhỏ càng liên quan."""
+    return _matches("tasks_fts", Task, search_query)
+
+def match_projects(search_query):
+    """Subquery (id, rank) các project khớp; rank càng nhỏ càng liên quan."""
+    return _matches("projects_fts", Project, search_query)
+
+SEARCH_PAGE_SIZE = 20
+TAG_FACET_LIMIT = 20
+
+class SearchResults:
+    """Một trang kết quả tìm kiếm toàn cục cùng facet và cursor trang kế tiếp."""
+
+    def __init__(self, tasks, projects, next_cursor, priority_facets, tag_facets):
+        self.tasks = tasks
+        self.projects = projects
+        self.next_cursor = next_cursor
+        self.priority_facets = priority_facets
+        self.tag_facets = tag_facets
+
+def _encode_cursor(rank, task_id):
+    return f"{task_id}" if rank is None else f"{rank!r}:{task_id}"
+
+def _decode_cursor(cursor):
+    try:
+        if ":" in cursor:
+            rank, task_id = cursor.rsplit(":", 1)
+            return float(rank), int(task_id)
+        return None, int(cursor)
+    except ValueError:
+        return None, None
+
+def search_accessible(db, user_id, search_query="", tag=None, priority=None,
+                      due_from=None, due_to=None, cursor=None, per_page=SEARCH_PAGE_SIZE):
+    """Tìm task/project trong mọi project user truy cập được (sở hữu hoặc được chia sẻ).
+
+    Quyền truy cập được lọc trong SQL; phân trang keyset theo (rank, id) khi có
+    từ khoá, theo id giảm dần khi không có.
+    """
+    allowed = accessible_project_ids(user_id)
+    filters = [Task.project_id.in_(allowed)]
+    if tag:
+        filters.append(Task.id.in_(
+            select(task_tags.c.task_id).join(Tag, Tag.id == task_tags.c.tag_id).where(Tag.name == tag)
+        ))
+    if priority:
+        filters.append(Task.priority == priority)
+    if due_from:
+        filters.append(Task.due_date >= due_from)
+    if due_to:
+        filters.append(Task.due_date < due_to)
+
+    query = db.query(Task).options(selectinload(Task.project), selectinload(Task.tags)).filter(*filters)
+    facet_ids = select(Task.id).where(*filters)
+    after_rank, after_id = _decode_cursor(cursor) if cursor else (None, None)
+
+    if search_query.strip():
+        matches = match_tasks(search_query)
+        query = query.join(matches, matches.c.id == Task.id).add_columns(matches.c.rank)
+        facet_ids = facet_ids.join(matches, matches.c.id == Task.id)
+        if after_id is not None and after_rank is not None:
+            query = query.filter(or_(
+                matches.c.rank > after_rank,
+                and_(matches.c.rank == after_rank, Task.id > after_id),
+            ))
+        rows = query.order_by(matches.c.rank, Task.id).limit(per_page + 1).all()
+    else:
+        if after_id is not None:
+            query = query.filter(Task.id < after_id)
+        rows = [(task, None) for task in query.order_by(Task.id.desc()).limit(per_page + 1).all()]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last_task, last_rank = rows[-1]
+        next_cursor = _encode_cursor(last_rank, last_task.id)
+    tasks = [task for task, _ in rows]
+
+    priority_facets = db.execute(
+        select(Task.priority, func.count(Task.id))
+        .where(Task.id.in_(facet_ids))
+        .group_by(Task.priority)
+    ).all()
+    tag_facets = db.execute(
+        select(Tag.name, func.count(task_tags.c.task_id).label("hits"))
+        .join(task_tags, task_tags.c.tag_id == Tag.id)
+        .where(task_tags.c.task_id.in_(facet_ids))
+        .group_by(Tag.name)
+        .order_by(func.count(task_tags.c.task_id).desc(), Tag.name)
+        .limit(TAG_FACET_LIMIT)
+    ).all()
+
+    projects = []
+    if search_query.strip() and not cursor:
+        project_matches = match_projects(search_query)
+        projects = (
+            db.query(Project)
+            .join(project_matches, project_matches.c.id == Project.id)
+            .filter(Project.id.in_(allowed))
+            .order_by(project_matches.c.rank)
+            .limit(per_page)
+            .all()
+        )
+
+    return SearchResults(tasks, projects, next_cursor, priority_facets, tag_facets)
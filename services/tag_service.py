@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import sqlite, postgresql
+from models.tag import Tag
+from models.task import Task, task_tags
+
+TAG_CACHE_SIZE = 1024
+
+class TagCache:
+    """Cache LRU có giới hạn ánh xạ tên tag -> id, an toàn giữa các thread."""
+
+    def __init__(self, maxsize=TAG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, names):
+        found, missing = {}, []
+        with self._lock:
+            for name in names:
+                if name in self._data:
+                    self._data.move_to_end(name)
+                    found[name] = self._data[name]
+                else:
+                    missing.append(name)
+        return found, missing
+
+    def put_many(self, mapping):
+        with self._lock:
+            for name, tag_id in mapping.items():
+                self._data[name] = tag_id
+                self._data.move_to_end(name)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+tag_cache = TagCache()
+
+@event.listens_for(Tag, "after_update")
+@event.listens_for(Tag, "after_delete")
+def _invalidate_tag_cache(mapper, connection, target):
+    tag_cache.clear()
+
+def _insert_missing_tags(db, names):
+    """Chèn các tag chưa có, bỏ qua tag vừa được request khác tạo đồng thời."""
+    rows = [{"name": name} for name in names]
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        db.execute(sqlite.insert(Tag.__table__).on_conflict_do_nothing(index_elements=["name"]), rows)
+    elif dialect == "postgresql":
+        db.execute(postgresql.insert(Tag.__table__).on_conflict_do_nothing(index_elements=["name"]), rows)
+    else:
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Tag.__table__), row)
+            except IntegrityError:
+                pass
+
+def resolve_tag_ids(db, names):
+    """Trả về {tên: id} cho danh sách tên tag, tạo các tag còn thiếu.
+
+    Tối đa hai SELECT ... IN và một INSERT hàng loạt, bất kể số lượng tag.
+    """
+    names = list(dict.fromkeys(names))
+    ids, missing = tag_cache.get_many(names)
+    if missing:
+        found = dict(db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(missing))).all())
+        tag_cache.put_many(found)
+        ids.update(found)
+        new_names = [name for name in missing if name not in found]
+        if new_names:
+            _insert_missing_tags(db, new_names)
+            ids.update(db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(new_names))).all())
+    return ids
+
+def set_tags_for_tasks(db, tags_by_task, replace=True):
+    """Gán tag cho nhiều task cùng lúc: {task_id: [tên tag]}."""
+    all_names = [name for names in tags_by_task.values() for name in names]
+    ids = resolve_tag_ids(db, all_names) if all_names else {}
+    if replace and tags_by_task:
+        db.execute(delete(task_tags).where(task_tags.c.task_id.in_(list(tags_by_task))))
+        # Đổi tag cũng là sửa task: ETag của trang project dựa trên updated_at
+        db.execute(
+            update(Task)
+            .where(Task.id.in_(list(tags_by_task)))
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    links = [
+        {"task_id": task_id, "tag_id": ids[name]}
+        for task_id, names in tags_by_task.items()
+        for name in dict.fromkeys(names)
+    ]
+    if links:
+        db.execute(insert(task_tags), links)
+
+def set_task_tags(db, task, names, replace=True):
+    """Gán tag cho một task (flush trước để task có id)."""
+    db.flush()
+    set_tags_for_tasks(db, {task.id: names}, replace=replace)
+    db.expire(task, ["tags"])
@@ -0,0 +1,83 @@
+from datetime import datetime
+from sqlalchemy import select, update, delete, func
+from models.task import Task, task_tags
+from models.counters import adjust_project_counters
+from services.user_stats import invalidate_user_stats
+from services.tag_service import set_tags_for_tasks
+
+def subtree_ids(root_ids):
+    """SELECT id của các task gốc và toàn bộ task con cháu (CTE đệ quy trên parent_id)."""
+    tree = select(Task.id).where(Task.id.in_(list(root_ids))).cte(name="subtree", recursive=True, nesting=True)
+    tree = tree.union_all(select(Task.id).where(Task.parent_id == tree.c.id))
+    return select(tree.c.id)
+
+def set_subtree_completed(db, task, status):
+    """Đặt trạng thái hoàn thành cho task và mọi sub-task bằng một câu UPDATE duy nhất."""
+    changed = set_subtrees_completed(db, task.project_id, [task.id], status)
+    db.expire(task)
+    return changed
+
+def set_subtrees_completed(db, project_id, root_ids, status):
+    """Đặt trạng thái hoàn thành cho nhiều task gốc cùng toàn bộ sub-task của chúng.
+
+    Câu UPDATE đi vòng qua ORM nên bộ đếm của project và cache thống kê của
+    các chủ task được cập nhật trực tiếp theo những dòng thực sự thay đổi.
+    """
+    # Session không autoflush: ghi các thay đổi ORM đang chờ trước, nếu không
+    # db.expire() phía sau sẽ bỏ mất chúng
+    db.flush()
+    owner_ids = db.scalars(
+        update(Task)
+        .where(
+            Task.id.in_(subtree_ids(root_ids)),
+            Task.project_id == project_id,
+            # Dòng cũ có completed NULL được coi là chưa hoàn thành (không nằm trong completed_count)
+            func.coalesce(Task.completed, False) != status,
+        )
+        .values(completed=status, updated_at=datetime.utcnow())
+        .returning(Task.owner_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    changed = len(owner_ids)
+    adjust_project_counters(db.connection(), project_id, 0, changed if status else -changed)
+    invalidate_user_stats(*set(owner_ids))
+    return changed
+
+def set_priority(db, project_id, task_ids, priority):
+    """Đổi độ ưu tiên của các task đã chọn trong project; trả về số task thay đổi."""
+    owner_ids = db.scalars(
+        update(Task)
+        .where(Task.id.in_(list(task_ids)), Task.project_id == project_id, Task.priority.is_distinct_from(priority))
+        .values(priority=priority, updated_at=datetime.utcnow())
+        .returning(Task.owner_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    invalidate_user_stats(*set(owner_ids))
+    return len(owner_ids)
+
+def retag(db, project_id, task_ids, names):
+    """Thay toàn bộ tag của các task đã chọn trong project."""
+    ids = db.scalars(select(Task.id).where(Task.id.in_(list(task_ids)), Task.project_id == project_id)).all()
+    if ids:
+        set_tags_for_tasks(db, {task_id: names for task_id in ids})
+    return len(ids)
+
+def delete_subtrees(db, project_id, root_ids):
+    """Xoá các task đã chọn cùng toàn bộ sub-task bằng DELETE theo tập hợp.
+
+    Thay cho cascade của ORM (nạp và xoá từng đối tượng); bộ đếm được trừ một lần.
+    """
+    subtree = subtree_ids(
+        db.scalars(select(Task.id).where(Task.id.in_(list(root_ids)), Task.project_id == project_id)).all()
+    )
+    db.execute(delete(task_tags).where(task_tags.c.task_id.in_(subtree)))
+    rows = db.execute(
+        delete(Task)
+        .where(Task.id.in_(subtree), Task.project_id == project_id)
+        .returning(Task.owner_id, Task.completed)
+        .execution_options(synchronize_session=False)
+    ).all()
+    completed = sum(1 for row in rows if row.completed)
+    adjust_project_counters(db.connection(), project_id, -len(rows), -completed)
+    invalidate_user_stats(*{row.owner_id for row in rows})
+    return len(rows)
@@ -0,0 +1,82 @@
+import math
+from sqlalchemy import case, select
+from sqlalchemy.orm import selectinload
+from models.task import Task
+from services.search import match_tasks
+
+TASKS_PER_PAGE = 20
+
+# Chiến lược nạp cho trang chi tiết: tag được nạp theo lô bằng SELECT ... IN,
+# tránh một truy vấn task_tags cho mỗi task khi template duyệt task.tags
+TREE_LOAD_OPTIONS = (selectinload(Task.tags),)
+
+# Thứ tự ưu tiên được đẩy xuống SQL thay vì sort bằng lambda trong Python
+PRIORITY_ORDER = case({"high": 0, "medium": 1, "low": 2}, value=Task.priority, else_=1)
+
+def _filter_clauses(search_query, completed_filter):
+    clauses = []
+    if search_query:
+        clauses.append(Task.id.in_(select(match_tasks(search_query).c.id)))
+    if completed_filter is not None:
+        clauses.append(Task.completed == (completed_filter == "true"))
+    return clauses
+
+class TaskTreePage:
+    """Một trang task gốc, mỗi task mang sẵn subtasks_list cho template."""
+
+    def __init__(self, tasks, page, per_page, total):
+        self.tasks = tasks
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = max(1, math.ceil(total / per_page))
+        self.has_prev = page > 1
+        self.has_next = page < self.pages
+
+def build_task_tree(db, project_id, search_query="", completed_filter=None, page=1, per_page=TASKS_PER_PAGE):
+    """Phân trang task gốc của project rồi nạp toàn bộ cây con của các task đó.
+
+    Bộ lọc áp dụng cho mọi cấp: một sub-task chỉ hiển thị khi nó và tất cả
+    task cha của nó đều khớp bộ lọc.
+    """
+    clauses = _filter_clauses(search_query, completed_filter)
+    page = max(1, page)
+
+    roots_query = db.query(Task).filter(Task.project_id == project_id, Task.parent_id.is_(None), *clauses)
+    total = roots_query.count()
+    # Trang vượt quá cuối (ví dụ sau khi xoá hàng loạt) hiển thị trang cuối cùng
+    page = min(page, max(1, math.ceil(total / per_page)))
+    roots = (
+        roots_query.options(*TREE_LOAD_OPTIONS)
+        .order_by(PRIORITY_ORDER, Task.id)
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+        .all()
+    )
+
+    nodes = {}
+    for task in roots:
+        task.subtasks_list = []
+        nodes[task.id] = task
+
+    if roots:
+        tree = (
+            select(Task.id)
+            .where(Task.parent_id.in_(list(nodes)), *clauses)
+            .cte(name="visible_subtasks", recursive=True)
+        )
+        tree = tree.union_all(select(Task.id).where(Task.parent_id == tree.c.id, *clauses))
+        descendants = (
+            db.query(Task)
+            .options(*TREE_LOAD_OPTIONS)
+            .filter(Task.id.in_(select(tree.c.id)))
+            .order_by(PRIORITY_ORDER, Task.id)
+            .all()
+        )
+        for task in descendants:
+            task.subtasks_list = []
+            nodes[task.id] = task
+        for task in descendants:
+            nodes[task.parent_id].subtasks_list.append(task)
+
+    return TaskTreePage(roots, page, per_page, total)
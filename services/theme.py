@@ -0,0 +1,19 @@
+from database import get_db
+from models.user import User
+from utils import TTLCache
+
+THEME_CACHE_TTL = 300
+
+theme_cache = TTLCache(ttl=THEME_CACHE_TTL)
+
+def get_user_theme(user_id):
+    """Theme của user, chỉ truy vấn DB khi cache hết hạn."""
+    theme = theme_cache.get(user_id)
+    if theme is None:
+        user = get_db().get(User, user_id)
+        theme = (user.theme if user else None) or "light"
+        theme_cache.set(user_id, theme)
+    return theme
+
+def invalidate_user_theme(user_id):
+    theme_cache.invalidate(user_id)
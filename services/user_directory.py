@@ -0,0 +1,110 @@
+import csv
+from io import StringIO
+from sqlalchemy import select, func, or_, literal
+from database import SessionLocal
+from models.user import User
+from models.project import Project
+from models.task import Task
+
+USER_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 1000
+STREAM_BUFFER_SIZE = 64 * 1024
+
+USER_CSV_HEADER = ["User ID", "Username", "Email", "Admin", "Joined", "Projects", "Tasks"]
+
+class UserPage:
+    """Một trang danh sách user (kèm số project/task) và cursor trang kế tiếp."""
+
+    def __init__(self, users, next_cursor):
+        self.users = users
+        self.next_cursor = next_cursor
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _filtered_users(search_query):
+    stmt = select(User.id, User.username, User.email, User.is_admin, User.created_at)
+    if search_query:
+        pattern = f"%{_escape_like(search_query)}%"
+        stmt = stmt.where(or_(
+            User.username.like(pattern, escape="\\"),
+            User.email.like(pattern, escape="\\"),
+        ))
+    return stmt
+
+def _with_counts(users):
+    """Gắn số project sở hữu và số task của mỗi user trong cùng một truy vấn.
+
+    Các bảng đếm chỉ gom nhóm trên những user có trong `users` (một trang hoặc một khối export).
+    """
+    user_ids = select(users.c.id)
+    project_counts = (
+        select(Project.owner_id, func.count(Project.id).label("n"))
+        .where(Project.owner_id.in_(user_ids))
+        .group_by(Project.owner_id)
+        .subquery()
+    )
+    task_counts = (
+        select(Task.owner_id, func.count(Task.id).label("n"))
+        .where(Task.owner_id.in_(user_ids))
+        .group_by(Task.owner_id)
+        .subquery()
+    )
+    return (
+        select(
+            users,
+            func.coalesce(project_counts.c.n, literal(0)).label("project_count"),
+            func.coalesce(task_counts.c.n, literal(0)).label("task_count"),
+        )
+        .outerjoin(project_counts, project_counts.c.owner_id == users.c.id)
+        .outerjoin(task_counts, task_counts.c.owner_id == users.c.id)
+        .order_by(users.c.id)
+    )
+
+def _page(db, search_query, after, limit):
+    stmt = _filtered_users(search_query)
+    if after is not None:
+        stmt = stmt.where(User.id > after)
+    users = stmt.order_by(User.id).limit(limit).cte("user_page")
+    return db.execute(_with_counts(users)).all()
+
+def list_users(db, search_query="", after=None, per_page=USER_PAGE_SIZE):
+    """Phân trang keyset theo id; tìm theo username/email ngay trong SQL."""
+    rows = _page(db, search_query, after, per_page + 1)
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = rows[-1].id
+    return UserPage(rows, next_cursor)
+
+def stream_users_csv(search_query=""):
+    """Sinh CSV toàn bộ user theo từng khối keyset, bộ nhớ không phụ thuộc số user.
+
+    Generator chạy sau khi view đã trả về nên dùng session riêng, đóng khi kết thúc.
+    """
+    db = SessionLocal()
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(USER_CSV_HEADER)
+    try:
+        after = None
+        while True:
+            rows = _page(db, search_query, after, EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                writer.writerow([
+                    row.id, row.username, row.email or "", row.is_admin,
+                    row.created_at.isoformat() if row.created_at else "",
+                    row.project_count, row.task_count,
+                ])
+            after = rows[-1].id
+            if buffer.tell() >= STREAM_BUFFER_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # Trả kết nối giữa các khối, không giữ transaction đọc suốt quá trình tải
+            db.rollback()
+        yield buffer.getvalue()
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case, event
+from models.project import Project
+from models.project_share import ProjectShare
+from models.task import Task
+from utils import TTLCache
+
+STATS_CACHE_TTL = 300
+RECENT_DAYS = 30
+PRIORITIES = ("high", "medium", "low")
+
+stats_cache = TTLCache(ttl=STATS_CACHE_TTL, maxsize=10000)
+
+class UserStats:
+    """Thống kê hiển thị trên trang profile của một user."""
+
+    def __init__(self, row):
+        self.project_count = row.project_count
+        self.shared_project_count = row.shared_project_count
+        self.task_count = row.task_count
+        self.completed_count = row.completed_count
+        self.overdue_count = row.overdue_count
+        self.completed_recently = row.completed_recently
+        self.priority_counts = {p: getattr(row, f"{p}_count") for p in PRIORITIES}
+
+    @property
+    def completion_rate(self):
+        return int(self.completed_count * 100 / self.task_count) if self.task_count else 0
+
+def _count_where(condition):
+    return func.count(case((condition, 1)))
+
+def _stats_query(user_id, now):
+    """Một câu SELECT: bộ đếm project là subquery vô hướng, bộ đếm task là aggregate có điều kiện.
+
+    `now` là giờ địa phương, cùng kiểu với due_date và với badge quá hạn trên trang.
+    """
+    recent_since = now - timedelta(days=RECENT_DAYS)
+    return (
+        select(
+            select(func.count(Project.id)).where(Project.owner_id == user_id)
+            .scalar_subquery().label("project_count"),
+            select(func.count(ProjectShare.id)).where(ProjectShare.user_id == user_id)
+            .scalar_subquery().label("shared_project_count"),
+            func.count(Task.id).label("task_count"),
+            _count_where(Task.completed == True).label("completed_count"),
+            _count_where((Task.completed == False) & (Task.due_date < now)).label("overdue_count"),
+            # Không có cột thời điểm hoàn thành; updated_at được đặt lại khi đổi trạng thái.
+            # updated_at lưu giờ UTC, lệch vài giờ so với `now` là không đáng kể trên cửa sổ 30 ngày
+            _count_where((Task.completed == True) & (Task.updated_at >= recent_since)).label("completed_recently"),
+            *[_count_where(Task.priority == p).label(f"{p}_count") for p in PRIORITIES],
+        )
+        .select_from(Task)
+        .where(Task.owner_id == user_id)
+    )
+
+def get_user_stats(db, user_id):
+    """Thống kê của user, chỉ truy vấn DB khi cache hết hạn hoặc đã bị xoá."""
+    stats = stats_cache.get(user_id)
+    if stats is None:
+        stats = UserStats(db.execute(_stats_query(user_id, datetime.now())).one())
+        stats_cache.set(user_id, stats)
+    return stats
+
+def invalidate_user_stats(*user_ids):
+    """Xoá cache thống kê; các đường ghi hàng loạt (đi vòng ORM) phải gọi trực tiếp."""
+    for user_id in user_ids:
+        stats_cache.invalidate(user_id)
+
+@event.listens_for(Task, "after_insert")
+@event.listens_for(Task, "after_update")
+@event.listens_for(Task, "after_delete")
+def _task_changed(mapper, connection, target):
+    invalidate_user_stats(target.owner_id)
+
+@event.listens_for(Project, "after_insert")
+@event.listens_for(Project, "after_delete")
+def _project_changed(mapper, connection, target):
+    invalidate_user_stats(target.owner_id)
+
+@event.listens_for(ProjectShare, "after_insert")
+@event.listens_for(ProjectShare, "after_delete")
+def _share_changed(mapper, connection, target):
+    invalidate_user_stats(target.user_id)
@@ -0,0 +1,62 @@
+import os
+import sys
+import itertools
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Phải đặt trước khi import config/database: DB in-memory, không chạy scheduler nền
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+import app as app_module
+from database import Base, engine, SessionLocal
+from services.http_cache import fragment_cache
+from services.permissions import role_cache
+from services.tag_service import tag_cache
+from services.theme import theme_cache
+from services.user_stats import stats_cache
+
+_usernames = itertools.count(1)
+
+@pytest.fixture
+def app():
+    app_module.app.config["TESTING"] = True
+    yield app_module.app
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    # Id được SQLite cấp lại sau khi xoá hết, cache theo id phải xoá theo
+    for cache in (fragment_cache, role_cache, tag_cache, theme_cache, stats_cache):
+        cache.clear()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def login(client, username=None):
+    username = username or f"user{next(_usernames)}"
+    client.post("/auth/register", data={"username": username, "password": "secret"})
+    client.post("/auth/login", data={"username": username, "password": "secret"})
+    with client.session_transaction() as session:
+        return session["user_id"]
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.user_id = login(client)
+    return client
+
+@pytest.fixture
+def project_id(client, db):
+    from models.project import Project
+    client.post("/project/create", data={"title": "Project", "description": "d"})
+    return db.query(Project.id).filter_by(owner_id=client.user_id).scalar()
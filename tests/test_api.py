@@ -0,0 +1,66 @@
+from models.task import Task
+
+def create_task(client, project_id, **data):
+    response = client.post(f"/api/v1/projects/{project_id}/tasks", json={"title": "Task", **data})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["data"]["id"]
+
+def test_batch_update_then_toggle_keeps_update(client, project_id, db):
+    task_id = create_task(client, project_id, priority="low")
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "update", "task_id": task_id, "data": {"title": "RENAMED", "priority": "high"}},
+        {"op": "toggle", "task_id": task_id},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    task = db.get(Task, task_id)
+    assert (task.title, task.priority, task.completed) == ("RENAMED", "high", True)
+
+def test_invalid_input_is_rejected(client, project_id, db):
+    task_id = create_task(client, project_id)
+    cases = [
+        client.post(f"/api/v1/projects/{project_id}/tasks", json={"title": "x", "description": {"a": 1}}),
+        client.post(f"/api/v1/projects/{project_id}/tasks", json={"title": "y", "completed": "false"}),
+        client.patch(f"/api/v1/tasks/{task_id}", json={"description": ["a"]}),
+        client.patch(f"/api/v1/tasks/{task_id}", json={"tags": [{"name": "a"}]}),
+        client.post(f"/api/v1/tasks/{task_id}/toggle", json={"completed": "false"}),
+        client.post(f"/api/v1/tasks/{task_id}/toggle", json=[1]),
+        client.post("/api/v1/batch", json={"operations": [{"op": "update", "task_id": task_id, "data": [1]}]}),
+        client.post("/api/v1/batch", json={"operations": [{"op": "create", "project_id": project_id, "data": "x"}]}),
+    ]
+    assert [response.status_code for response in cases] == [400] * len(cases)
+    db.expire_all()
+    assert db.query(Task).count() == 1
+    assert db.get(Task, task_id).completed is False
+
+def test_toggle_accepts_explicit_boolean_or_empty_body(client, project_id, db):
+    task_id = create_task(client, project_id)
+    assert client.post(f"/api/v1/tasks/{task_id}/toggle").get_json()["data"]["completed"] is True
+    response = client.post(f"/api/v1/tasks/{task_id}/toggle", json={"completed": True})
+    assert response.get_json()["data"]["completed"] is True
+    response = client.post(f"/api/v1/tasks/{task_id}/toggle", json={"completed": False})
+    assert response.get_json()["data"]["completed"] is False
+
+def test_batch_result_is_null_for_task_deleted_later_in_batch(client, project_id, db):
+    task_id = create_task(client, project_id)
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "update", "task_id": task_id, "data": {"priority": "high"}},
+        {"op": "delete", "task_id": task_id},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()["data"] == [None, None]
+    assert db.get(Task, task_id) is None
+
+def test_batch_toggle_child_then_delete_parent(client, project_id, db):
+    parent_id = create_task(client, project_id, title="Parent")
+    child_id = create_task(client, project_id, title="Child", parent_id=parent_id)
+    other_id = create_task(client, project_id, title="Other")
+    response = client.post("/api/v1/batch", json={"operations": [
+        {"op": "toggle", "task_id": child_id},
+        {"op": "toggle", "task_id": other_id},
+        {"op": "delete", "task_id": parent_id},
+    ]})
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()["data"]
+    assert data[0] is None and data[2] is None
+    assert (data[1]["id"], data[1]["completed"]) == (other_id, True)
+    assert db.query(Task).count() == 1
@@ -0,0 +1,41 @@
+import io
+from models.project import Project
+from models.task import Task
+from services import importer
+
+CSV = """Task ID,Title,Completed,Priority,Parent ID,Tags
+1,Root,true,high,,a
+2,Child,false,low,1,b
+3,Broken,true,urgent,,c
+4,Grandchild,true,medium,2,
+5,Last,false,,,
+"""
+
+def test_database_error_skips_only_the_failing_row(client, project_id, db, monkeypatch):
+    # Cho qua bước kiểm tra trong Python để CHECK constraint của DB từ chối dòng 4
+    monkeypatch.setattr(importer, "PRIORITIES", importer.PRIORITIES | {"urgent"})
+    report = importer.import_tasks(db, project_id, client.user_id, io.StringIO(CSV), chunk_size=2)
+
+    assert report.imported == 4
+    assert [line for line, _ in report.errors] == [4]
+    assert report.errors[0][1].startswith("database error")
+
+    db.expire_all()
+    tasks = {task.title: task for task in db.query(Task).all()}
+    assert sorted(tasks) == ["Child", "Grandchild", "Last", "Root"]
+    assert tasks["Grandchild"].parent_id == tasks["Child"].id
+    assert tasks["Child"].parent_id == tasks["Root"].id
+    assert [tag.name for tag in tasks["Root"].tags] == ["a"]
+    project = db.get(Project, project_id)
+    assert (project.task_count, project.completed_count) == (4, 2)
+
+def test_cli_rejects_missing_project_or_owner(app, client, project_id, tmp_path, db):
+    path = tmp_path / "tasks.csv"
+    path.write_text(CSV)
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=["import-tasks", str(project_id + 100), str(path), "--owner", str(client.user_id)])
+    assert result.exit_code == 1 and f"Project {project_id + 100} does not exist." in result.output
+    result = runner.invoke(args=["import-tasks", str(project_id), str(path), "--owner", str(client.user_id + 100)])
+    assert result.exit_code == 1 and f"User {client.user_id + 100} does not exist." in result.output
+    assert db.query(Task).count() == 0
@@ -0,0 +1,22 @@
+from models.project import Project
+from services.permissions import get_project_role, role_cache
+from tests.conftest import login
+
+def test_denied_role_is_not_cached(client, db):
+    assert get_project_role(db, 999, client.user_id) is None
+    db.add(Project(id=999, title="Reused id", owner_id=client.user_id))
+    db.commit()
+    assert get_project_role(db, 999, client.user_id) == "owner"
+    assert role_cache.get((999, client.user_id)) == "owner"
+
+def flashed(client, path):
+    assert client.get(path).status_code == 302
+    with client.session_transaction() as session:
+        return session.pop("_flashes", [])[-1][1]
+
+def test_missing_project_flashes_not_found(client, project_id, app):
+    assert flashed(client, f"/project/{project_id + 100}") == "Project not found."
+
+    other = app.test_client()
+    login(other)
+    assert flashed(other, f"/project/{project_id}") == "You don't have access to this project."
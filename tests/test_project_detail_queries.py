@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import event
+from database import engine
+from models.task import Task
+from services.tag_service import set_tags_for_tasks
+
+def add_tagged_tasks(db, project_id, owner_id, count):
+    """`count` task gốc, mỗi task có một sub-task; mọi task đều có hai tag."""
+    start = db.query(Task).count()
+    roots = [Task(title=f"root {start + i}", project_id=project_id, owner_id=owner_id) for i in range(count)]
+    db.add_all(roots)
+    db.flush()
+    children = [
+        Task(title=f"child {start + i}", project_id=project_id, owner_id=owner_id, parent_id=root.id)
+        for i, root in enumerate(roots)
+    ]
+    db.add_all(children)
+    db.flush()
+    set_tags_for_tasks(db, {task.id: ["alpha", f"tag{task.id % 7}"] for task in roots + children})
+    db.commit()
+
+def count_detail_page_queries(client, project_id):
+    client.get(f"/project/{project_id}")  # làm nóng cache vai trò
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get(f"/project/{project_id}")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    return len(statements)
+
+@pytest.mark.parametrize("query", ["", "?search=root", "?completed=false"])
+def test_detail_page_query_count_does_not_grow_with_tasks(client, project_id, db, query):
+    add_tagged_tasks(db, project_id, client.user_id, 5)
+    small = count_detail_page_queries(client, f"{project_id}{query}")
+    add_tagged_tasks(db, project_id, client.user_id, 55)
+    large = count_detail_page_queries(client, f"{project_id}{query}")
+    assert small == large
+
+def test_page_past_the_end_shows_last_page(client, project_id, db):
+    add_tagged_tasks(db, project_id, client.user_id, 25)
+    response = client.get(f"/project/{project_id}?page=9")
+    assert response.status_code == 200
+    assert b"root 24" in response.data
+    assert b"This project has no tasks yet" not in response.data
@@ -0,0 +1,10 @@
+from sqlalchemy import select
+from models import migrate
+from models.task import Task
+
+def test_hot_queries_use_indexes():
+    assert migrate.advise_indexes() == {}
+
+def test_advisor_reports_full_scans(monkeypatch):
+    monkeypatch.setitem(migrate.HOT_QUERIES, "tasks by description", select(Task.id).where(Task.description == "x"))
+    assert list(migrate.advise_indexes()) == ["tasks by description"]
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from models.scheduled_job import ScheduledJob
+from services import scheduler
+
+def test_check_reminders_requires_admin(client):
+    assert client.post("/task/check_reminders").status_code == 403
+    assert client.get("/task/check_reminders").status_code == 405
+
+def test_check_reminders_only_reschedules_the_job(client, db, monkeypatch):
+    sent = []
+    monkeypatch.setattr(scheduler, "dispatch_reminders", lambda app, now=None: sent.append(now))
+    scheduler._ensure_job_rows(db)
+    db.query(ScheduledJob).update({"next_run_at": datetime.utcnow() + timedelta(hours=1)})
+    db.commit()
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+
+    assert client.post("/task/check_reminders").status_code == 202
+    assert sent == []
+    db.expire_all()
+    assert db.get(ScheduledJob, "reminders").next_run_at <= datetime.utcnow()
+
+def test_only_one_worker_acquires_a_due_job(db):
+    scheduler._ensure_job_rows(db)
+    job = next(job for job in scheduler.JOBS if job.name == "reminders")
+    scheduler.request_run(db, job.name)
+    now = datetime.utcnow()
+    assert scheduler._try_acquire(db, job, now) is True
+    assert scheduler._try_acquire(db, job, now) is False
@@ -0,0 +1,56 @@
+import threading
+from sqlalchemy import text, func
+from sqlalchemy.orm import sessionmaker
+from database import Base, create_db_engine
+from models.user import User
+
+WRITERS = 4
+READERS = 4
+WRITES_PER_THREAD = 50
+
+def test_concurrent_reads_and_writes_do_not_lock(tmp_path):
+    """Với WAL và busy_timeout, đọc không chặn ghi và ghi chờ nhau thay vì báo "database is locked"."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'concurrency.db'}")
+    try:
+        Base.metadata.create_all(engine)
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() > 0
+
+        Session = sessionmaker(bind=engine, autoflush=False)
+        errors = []
+        writers_done = threading.Event()
+
+        def write(worker):
+            try:
+                for i in range(WRITES_PER_THREAD):
+                    with Session() as db:
+                        db.add(User(username=f"w{worker}-{i}", password_hash="x"))
+                        db.commit()
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                while not writers_done.is_set():
+                    with Session() as db:
+                        db.query(func.count(User.id)).scalar()
+                        db.query(User).order_by(User.id.desc()).limit(10).all()
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(READERS)]
+        writers = [threading.Thread(target=write, args=(n,)) for n in range(WRITERS)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writers_done.set()
+        for thread in readers:
+            thread.join()
+
+        assert errors == []
+        with Session() as db:
+            assert db.query(User).count() == WRITERS * WRITES_PER_THREAD
+    finally:
+        engine.dispose()
@@ -0,0 +1,18 @@
+from models.task import Task
+
+def test_invalid_priority_is_rejected_by_html_forms(client, project_id, db):
+    client.post(f"/task/create/{project_id}", data={"title": "Task", "priority": "high"})
+    task = db.query(Task).one()
+
+    responses = [
+        client.post(f"/task/create/{project_id}", data={"title": "Other", "priority": "urgent"}),
+        client.post(f"/task/create_subtask/{task.id}", data={"title": "Child", "priority": "urgent"}),
+        client.post(f"/task/edit/{task.id}", data={"title": "Task", "priority": "urgent"}),
+    ]
+    assert [response.status_code for response in responses] == [302, 200, 200]
+    db.expire_all()
+    assert [(t.title, t.priority) for t in db.query(Task).all()] == [("Task", "high")]
+
+def test_blank_priority_defaults_to_medium(client, project_id, db):
+    client.post(f"/task/create/{project_id}", data={"title": "Task", "priority": ""})
+    assert db.query(Task.priority).scalar() == "medium"
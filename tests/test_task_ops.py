@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import update
+from models.project import Project
+from models.task import Task
+from services.task_ops import subtree_ids, set_subtree_completed
+
+def add_task(db, project_id, owner_id, title, parent=None):
+    task = Task(title=title, project_id=project_id, owner_id=owner_id, parent_id=parent.id if parent else None)
+    db.add(task)
+    db.flush()
+    return task
+
+def build_deep(db, project_id, owner_id, depth=60):
+    """Một chuỗi task lồng nhau sâu `depth` cấp."""
+    root = node = add_task(db, project_id, owner_id, "deep 0")
+    for level in range(1, depth):
+        node = add_task(db, project_id, owner_id, f"deep {level}", node)
+    return root
+
+def build_wide(db, project_id, owner_id, width=40, fanout=3):
+    """Task gốc có `width` con, mỗi con có `fanout` cháu."""
+    root = add_task(db, project_id, owner_id, "wide")
+    for i in range(width):
+        child = add_task(db, project_id, owner_id, f"wide {i}", root)
+        for j in range(fanout):
+            add_task(db, project_id, owner_id, f"wide {i}.{j}", child)
+    return root
+
+def walk(task):
+    """Id của task và mọi sub-task, duyệt đệ quy qua quan hệ subtasks."""
+    ids = {task.id}
+    for child in task.subtasks:
+        ids |= walk(child)
+    return ids
+
+@pytest.fixture
+def trees(client, project_id, db):
+    deep = build_deep(db, project_id, client.user_id)
+    wide = build_wide(db, project_id, client.user_id)
+    db.commit()
+    return deep, wide
+
+def test_subtree_ids_matches_recursive_walk(db, trees):
+    deep, wide = trees
+    middle = db.query(Task).filter_by(title="deep 30").one()
+    for roots in ([deep], [wide], [middle], [deep, wide]):
+        expected = set().union(*(walk(task) for task in roots))
+        assert set(db.scalars(subtree_ids([task.id for task in roots]))) == expected
+
+@pytest.mark.parametrize("tree", ["deep", "wide"])
+def test_toggle_updates_completed_count_both_ways(db, project_id, trees, tree):
+    root = trees[0] if tree == "deep" else trees[1]
+    other = trees[1] if tree == "deep" else trees[0]
+    size = len(walk(root))
+
+    assert set_subtree_completed(db, root, True) == size
+    db.commit()
+    db.expire_all()
+    assert db.get(Project, project_id).completed_count == size
+    assert db.query(Task).filter(Task.id.in_(walk(root)), Task.completed == False).count() == 0
+    assert db.query(Task).filter(Task.id.in_(walk(other)), Task.completed == True).count() == 0
+
+    # Đánh dấu lại cây đã hoàn thành không thay đổi gì
+    assert set_subtree_completed(db, root, True) == 0
+    assert set_subtree_completed(db, root, False) == size
+    db.commit()
+    db.expire_all()
+    assert db.get(Project, project_id).completed_count == 0
+    assert db.query(Task).filter(Task.completed == True).count() == 0
+
+def test_null_completed_is_treated_as_incomplete(db, project_id, trees):
+    deep, wide = trees
+    db.execute(update(Task).where(Task.id.in_(walk(wide))).values(completed=None))
+    db.commit()
+
+    assert set_subtree_completed(db, wide, False) == 0
+    db.commit()
+    assert db.get(Project, project_id).completed_count == 0
+
+    size = len(walk(wide))
+    assert set_subtree_completed(db, wide, True) == size
+    db.commit()
+    db.expire_all()
+    assert db.get(Project, project_id).completed_count == size
@@ -0,0 +1,22 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from models.task import Task
+from services.user_stats import get_user_stats
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    """Múi giờ UTC+7, để giờ địa phương và giờ UTC khác nhau."""
+    monkeypatch.setenv("TZ", "Asia/Ho_Chi_Minh")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_overdue_count_uses_local_time(client, project_id, db, local_timezone):
+    # Đã quá hạn theo giờ địa phương nhưng chưa quá hạn theo giờ UTC
+    due = datetime.now() - timedelta(hours=1)
+    db.add(Task(title="Late", project_id=project_id, owner_id=client.user_id, due_date=due))
+    db.add(Task(title="Later", project_id=project_id, owner_id=client.user_id, due_date=due + timedelta(days=1)))
+    db.commit()
+    assert get_user_stats(db, client.user_id).overdue_count == 1